@@ -2,16 +2,17 @@ import streamlit as st
 import os
 import tempfile
 import shutil
+import time
+import uuid
 from pathlib import Path
 import warnings
 warnings.filterwarnings("ignore")
 
 # Import utility modules - FIXED: utila → utils
-from utils.video_processor import extract_audio, replace_audio_track
-from utils.transcriber import transcribe_audio
-from utils.subtitle_generator import generate_subtitle_file, format_time
-from utils.translator import translate_subtitles
-from utils.audio_generator import generate_dubbed_audio
+from utils.model_registry import preload_whisper_models
+from utils.subtitle_track import SubtitleTrack
+from utils.pipeline import create_subtitles, create_dub
+from utils.jobs import get_job_executor, QUEUED, FAILED
 
 # Page configuration
 st.set_page_config(
@@ -427,10 +428,10 @@ if 'temp_dir' not in st.session_state:
     st.session_state.temp_dir = None
 if 'review_stage' not in st.session_state:
     st.session_state.review_stage = False
-if 'original_subtitles_data' not in st.session_state:
-    st.session_state.original_subtitles_data = []
-if 'translated_subtitles_data' not in st.session_state:
-    st.session_state.translated_subtitles_data = []
+if 'original_track' not in st.session_state:
+    st.session_state.original_track = SubtitleTrack()
+if 'translated_track' not in st.session_state:
+    st.session_state.translated_track = SubtitleTrack()
 if 'video_path' not in st.session_state:
     st.session_state.video_path = None
 if 'audio_path' not in st.session_state:
@@ -446,8 +447,26 @@ if 'progress_status' not in st.session_state:
         'audio_generation': 'pending',
         'video_merging': 'pending'
     }
-if 'start_stage2' not in st.session_state:
-    st.session_state.start_stage2 = False
+if 'job_id' not in st.session_state:
+    st.session_state.job_id = None
+if 'job_notes' not in st.session_state:
+    st.session_state.job_notes = []
+if 'queue_position' not in st.session_state:
+    st.session_state.queue_position = None
+if 'session_owner' not in st.session_state:
+    # Identifies this browser session to the fair stage scheduler
+    st.session_state.session_owner = uuid.uuid4().hex
+
+@st.cache_resource(show_spinner=False)
+def warm_transcription_model():
+    """Load the default Whisper model once per server process"""
+    preload_whisper_models()
+    return True
+
+warm_transcription_model()
+
+# Seconds between status polls while a background job runs
+JOB_POLL_INTERVAL = 1.0
 
 # Language options
 LANGUAGES = {
@@ -488,8 +507,13 @@ def display_progress_tracker(container=None):
     html_parts.append("<div class='progress-tracker'>")
     html_parts.append("<h3 style='text-align: center; color: #667eea; margin-top: 0; margin-bottom: 20px;'>📊 Processing Status</h3>")
     
+    queue_step, queue_position = st.session_state.queue_position or (None, 0)
+    
     for task_id, task_name, task_desc in tasks:
         status = st.session_state.progress_status[task_id]
+        if task_id == queue_step:
+            # Waiting for a free slot of this stage behind other users' jobs
+            task_desc = f"⏳ Waiting in queue, position {queue_position}"
         
         if status == 'completed':
             icon = '✓'
@@ -538,150 +562,119 @@ def reset_progress_status():
         'video_merging': 'pending'
     }
 
-def read_srt_file(srt_path):
-    """Read and parse SRT file into a list of subtitle dictionaries"""
-    import pysrt
-    try:
-        subs = pysrt.open(srt_path, encoding='utf-8')
-        subtitles_data = []
-        for sub in subs:
-            subtitles_data.append({
-                'index': sub.index,
-                'start': str(sub.start),
-                'end': str(sub.end),
-                'text': sub.text
-            })
-        return subtitles_data
-    except Exception as e:
-        st.error(f"Error reading SRT file: {str(e)}")
-        return []
-
-def save_edited_subtitles(subtitles_data, output_path):
-    """Save edited subtitles back to SRT file"""
-    import pysrt
+def save_edited_subtitles(track, edited_texts, output_path):
+    """Apply the edited texts to the translated track and write its SRT for download"""
+    edited_track = track.with_texts(edited_texts[i] for i in range(len(track)))
     try:
-        subs = pysrt.SubRipFile()
-        for sub_data in subtitles_data:
-            sub = pysrt.SubRipItem(
-                index=sub_data['index'],
-                start=sub_data['start'],
-                end=sub_data['end'],
-                text=sub_data['text']
-            )
-            subs.append(sub)
-        subs.save(output_path, encoding='utf-8')
+        edited_track.to_srt(output_path)
     except Exception as e:
         st.error(f"Error saving edited subtitles: {str(e)}")
+    return edited_track
 
-def process_video_stage1(video_file, target_language, source_language):
-    """Stage 1: Transcribe and translate subtitles for review"""
-    try:
-        # Create temporary directory for processing
-        temp_dir = tempfile.mkdtemp()
-        st.session_state.temp_dir = temp_dir
-        
-        # Save uploaded video to temp directory
-        video_path = os.path.join(temp_dir, "input_video.mp4")
-        with open(video_path, "wb") as f:
-            f.write(video_file.read())
-        
-        # Display progress tracker first
-        progress_container = st.empty()
-        
-        # Step 1: Extract audio
-        st.session_state.progress_status['audio_extraction'] = 'processing'
-        display_progress_tracker(progress_container)
-        
-        # Create status text and progress bar after the tracker
-        status_text = st.empty()
-        progress_bar = st.progress(0)
-        
-        status_text.text("🎵 Extracting audio from video...")
-        progress_bar.progress(20)
-        audio_path = os.path.join(temp_dir, "extracted_audio.wav")
-        extract_audio(video_path, audio_path)
-        st.session_state.progress_status['audio_extraction'] = 'completed'
-        display_progress_tracker(progress_container)
-        
-        # Step 2: Transcribe audio
-        st.session_state.progress_status['transcription'] = 'processing'
-        display_progress_tracker(progress_container)
-        status_text.text("📝 Transcribing audio (this may take a few minutes)...")
-        progress_bar.progress(40)
-        language, segments = transcribe_audio(audio_path)
-        st.session_state.progress_status['transcription'] = 'completed'
-        display_progress_tracker(progress_container)
-        
-        # Step 3: Generate original subtitle file
-        st.session_state.progress_status['subtitle_generation'] = 'processing'
-        display_progress_tracker(progress_container)
-        status_text.text("📄 Generating subtitle file...")
-        progress_bar.progress(60)
-        original_subtitle_path = os.path.join(temp_dir, f"subtitles_{language}.srt")
-        generate_subtitle_file(segments, original_subtitle_path)
-        
-        # Step 4: Translate subtitles
-        st.session_state.progress_status['translation'] = 'processing'
-        display_progress_tracker(progress_container)
-        status_text.text(f"🌐 Translating subtitles to {target_language}...")
-        progress_bar.progress(80)
-        translated_subtitle_path = os.path.join(temp_dir, f"subtitles_{LANGUAGES[target_language]}.srt")
-        translate_subtitles(original_subtitle_path, translated_subtitle_path, 
-                          LANGUAGES[target_language], source_language)
-        st.session_state.progress_status['translation'] = 'completed'
-        st.session_state.progress_status['subtitle_generation'] = 'completed'
-        display_progress_tracker(progress_container)
-        
-        # Complete stage 1
-        progress_bar.progress(100)
-        status_text.text("✅ Subtitles ready for review!")
-        
-        return video_path, audio_path, original_subtitle_path, translated_subtitle_path
-        
-    except Exception as e:
-        st.error(f"Error during processing: {str(e)}")
-        cleanup_temp_dir()
-        reset_progress_status()
-        return None, None, None, None
+def start_subtitles_job(video_file, target_lang_code, source_lang_code):
+    """Stage 1: save the upload and queue transcription and translation in the background"""
+    # Create temporary directory for processing
+    temp_dir = tempfile.mkdtemp()
+    st.session_state.temp_dir = temp_dir
+    
+    # Save uploaded video to temp directory
+    video_path = os.path.join(temp_dir, "input_video.mp4")
+    with open(video_path, "wb") as f:
+        f.write(video_file.read())
+    
+    job = get_job_executor().submit(
+        "subtitles", create_subtitles, video_path, temp_dir, target_lang_code, source_lang_code,
+        owner=st.session_state.session_owner
+    )
+    st.session_state.job_id = job.id
+    st.session_state.job_notes = []
 
-def process_video_stage2(video_path, translated_subtitle_path, target_lang_code, progress_container):
-    """Stage 2: Generate dubbed audio and create final video"""
-    try:
-        temp_dir = st.session_state.temp_dir
-        
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-        
-        # Step 1: Generate dubbed audio
-        st.session_state.progress_status['audio_generation'] = 'processing'
-        display_progress_tracker(progress_container)
-        status_text.text("🎤 Generating dubbed audio (this may take a few minutes)...")
-        progress_bar.progress(30)
-        dubbed_audio_path = os.path.join(temp_dir, "dubbed_audio.wav")
-        generate_dubbed_audio(translated_subtitle_path, dubbed_audio_path, target_lang_code)
-        st.session_state.progress_status['audio_generation'] = 'completed'
-        display_progress_tracker(progress_container)
-        
-        # Step 2: Replace audio track
-        st.session_state.progress_status['video_merging'] = 'processing'
-        display_progress_tracker(progress_container)
-        status_text.text("🎬 Creating final dubbed video...")
-        progress_bar.progress(70)
-        output_video_path = os.path.join(temp_dir, "output_dubbed_video.mp4")
-        replace_audio_track(video_path, dubbed_audio_path, output_video_path)
-        st.session_state.progress_status['video_merging'] = 'completed'
-        display_progress_tracker(progress_container)
-        
-        # Complete
-        progress_bar.progress(100)
-        status_text.text("✅ Video dubbing completed successfully!")
-        
-        return output_video_path
-        
-    except Exception as e:
-        st.error(f"Error during dubbing: {str(e)}")
+def start_dub_job():
+    """Stage 2: queue dubbed audio generation and video merging in the background"""
+    job = get_job_executor().submit(
+        "dub", create_dub,
+        st.session_state.video_path,
+        st.session_state.translated_track,
+        st.session_state.target_lang_code,
+        st.session_state.temp_dir,
+        owner=st.session_state.session_owner
+    )
+    st.session_state.job_id = job.id
+    st.session_state.job_notes = []
+
+def display_job_progress(snapshot):
+    """Show the progress of the running background job"""
+    if snapshot['kind'] == 'dub':
+        st.divider()
+        st.markdown("""
+        <div style='text-align: center; padding: 15px; background: linear-gradient(135deg, #667eea15 0%, #764ba215 100%); border-radius: 10px; margin: 20px 0;'>
+            <h2 style='color: #667eea; margin: 0;'>🎬 Generating Dubbed Video</h2>
+            <p style='color: #666; margin-top: 8px;'>Please wait while we create your dubbed video...</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    display_progress_tracker()
+    if snapshot['status'] == QUEUED:
+        st.text("⏳ Waiting for a free worker...")
+    elif snapshot['queue']:
+        st.text(f"⏳ Other videos are being processed; you are number {snapshot['queue'][1]} in the queue...")
+    else:
+        st.text(snapshot['message'])
+    st.progress(snapshot['percent'])
+
+def finish_job(job, snapshot):
+    """Copy a finished job's results into the session"""
+    st.session_state.job_id = None
+    st.session_state.processing = False
+    st.session_state.queue_position = None
+    
+    if snapshot['status'] == FAILED:
+        if snapshot['kind'] == 'subtitles':
+            st.session_state.job_notes = [('error', f"Error during processing: {snapshot['error']}")]
+            cleanup_temp_dir()
+        else:
+            st.session_state.job_notes = [('error', f"Error during dubbing: {snapshot['error']}")]
+            # Let the user retry from the review screen
+            st.session_state.review_stage = True
         reset_progress_status()
-        return None
+        return
+    
+    result = job.result
+    notes = []
+    if snapshot['kind'] == 'subtitles':
+        # Keep the in-memory tracks for review
+        st.session_state.original_track = result.original_track
+        st.session_state.translated_track = result.translated_track
+        st.session_state.video_path = result.video_path
+        st.session_state.audio_path = result.audio_path
+        st.session_state.original_subtitle = result.original_subtitle_path
+        st.session_state.translated_subtitle = result.translated_subtitle_path
+        # Initialize fresh edited translations for the new video
+        st.session_state.edited_translations = dict(enumerate(result.translated_track.texts))
+        st.session_state.review_stage = True
+        
+        if result.failed_lines:
+            notes.append(('warning', f"⚠️ {result.failed_lines} subtitle lines could not be translated and were kept in the original language. Please review them below."))
+        stats = result.consolidation_stats
+        if stats.get('merged'):
+            notes.append(('caption',
+                f"🔗 Merged {stats['input_segments']} transcribed segments into "
+                f"{stats['output_segments']} lines ({stats['tts_calls_saved']} fewer TTS calls)"))
+    else:
+        st.session_state.processed_video = result.output_video_path
+        tts_stats = result.tts_stats
+        if tts_stats["reused"] or tts_stats["cache_hits"]:
+            notes.append(('caption',
+                f"♻️ {tts_stats['reused']} unchanged lines kept from the previous render, "
+                f"{tts_stats['cache_hits']} reused from the speech cache, "
+                f"{tts_stats['synthesized']} synthesized "
+                f"({tts_stats['cached_seconds']:.0f}s of audio not re-synthesized)"))
+    st.session_state.job_notes = notes
+
+def display_job_notes():
+    """Show warnings and stats left by the last finished job"""
+    for level, text in st.session_state.job_notes:
+        getattr(st, level)(text)
 
 # Main app UI
 st.title("🎬 Video Dubbing Application")
@@ -734,76 +727,35 @@ if uploaded_file is not None and not st.session_state.review_stage:
     if st.button("🚀 Start Dubbing Process", disabled=st.session_state.processing, type="primary"):
         st.session_state.processing = True
         reset_progress_status()
+        st.session_state.target_lang_code = LANGUAGES[target_language]
         
-        # Get source language code
-        src_lang = LANGUAGES[source_language]
-        
-        # Process the video - Stage 1 (transcribe and translate)
-        video_path, audio_path, original_srt, translated_srt = process_video_stage1(
-            uploaded_file, 
-            target_language,
-            src_lang
-        )
-        
-        if original_srt and translated_srt:
-            # Read and store subtitle data for review
-            st.session_state.original_subtitles_data = read_srt_file(original_srt)
-            st.session_state.translated_subtitles_data = read_srt_file(translated_srt)
-            st.session_state.video_path = video_path
-            st.session_state.audio_path = audio_path
-            st.session_state.original_subtitle = original_srt
-            st.session_state.translated_subtitle = translated_srt
-            st.session_state.target_lang_code = LANGUAGES[target_language]
-            # Initialize fresh edited translations for the new video
-            st.session_state.edited_translations = {
-                i: sub['text'] for i, sub in enumerate(st.session_state.translated_subtitles_data)
-            }
-            st.session_state.review_stage = True
-        
-        st.session_state.processing = False
+        # Stage 1 (transcribe and translate) runs in the background
+        start_subtitles_job(uploaded_file, LANGUAGES[target_language], LANGUAGES[source_language])
         st.rerun()
 
-# Stage 2 Processing (after review approval)
-if st.session_state.start_stage2 and not st.session_state.processed_video:
-    st.session_state.processing = True
-    
-    # Display processing header
-    st.divider()
-    st.markdown("""
-    <div style='text-align: center; padding: 15px; background: linear-gradient(135deg, #667eea15 0%, #764ba215 100%); border-radius: 10px; margin: 20px 0;'>
-        <h2 style='color: #667eea; margin: 0;'>🎬 Generating Dubbed Video</h2>
-        <p style='color: #666; margin-top: 8px;'>Please wait while we create your dubbed video...</p>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    # Create progress container
-    progress_container = st.empty()
-    
-    try:
-        # Process stage 2 - Generate dubbed video
-        output_path = process_video_stage2(
-            st.session_state.video_path,
-            st.session_state.translated_subtitle,
-            st.session_state.target_lang_code,
-            progress_container
-        )
-        
-        if output_path and os.path.exists(output_path):
-            st.session_state.processed_video = output_path
-            st.session_state.start_stage2 = False
-        else:
-            # If processing failed, reset flags so user can retry
-            st.session_state.start_stage2 = False
-            st.session_state.review_stage = True
-    finally:
-        # Always reset processing flag and clear start_stage2 to prevent infinite loops
+# Poll the running background job; the script only displays its status
+if st.session_state.job_id:
+    job = get_job_executor().get(st.session_state.job_id)
+    if job is None:
+        # Expired or lost with a server restart
+        st.session_state.job_id = None
         st.session_state.processing = False
-        if st.session_state.start_stage2:
-            st.session_state.start_stage2 = False
-            st.session_state.review_stage = True
+        reset_progress_status()
+        st.rerun()
+    
+    snapshot = job.snapshot()
+    st.session_state.progress_status = snapshot['progress_status']
+    st.session_state.queue_position = snapshot['queue']
+    if job.done:
+        finish_job(job, snapshot)
+        st.rerun()
     
+    display_job_progress(snapshot)
+    time.sleep(JOB_POLL_INTERVAL)
     st.rerun()
 
+display_job_notes()
+
 # Subtitle Review Stage
 if st.session_state.review_stage and not st.session_state.processed_video and not st.session_state.processing:
     st.divider()
@@ -812,27 +764,25 @@ if st.session_state.review_stage and not st.session_state.processed_video and no
     st.info("Compare the original and translated subtitles below. You can edit the translated text before generating the dubbed audio.")
     
     # Create scrollable container for subtitles
-    if st.session_state.original_subtitles_data and st.session_state.translated_subtitles_data:
+    original_track = st.session_state.original_track
+    translated_track = st.session_state.translated_track
+    if len(original_track) and len(translated_track):
         # Store edited translations in session state if not already there
         if 'edited_translations' not in st.session_state:
-            st.session_state.edited_translations = {
-                i: sub['text'] for i, sub in enumerate(st.session_state.translated_subtitles_data)
-            }
+            st.session_state.edited_translations = dict(enumerate(translated_track.texts))
         
         # Display subtitle pairs
         st.markdown("---")
         
-        for i, (orig_sub, trans_sub) in enumerate(zip(
-            st.session_state.original_subtitles_data,
-            st.session_state.translated_subtitles_data
-        )):
+        for i in range(min(len(original_track), len(translated_track))):
             col1, col2 = st.columns(2)
             
             with col1:
-                st.markdown(f"**#{orig_sub['index']} - {orig_sub['start']} → {orig_sub['end']}**")
+                orig_start, orig_end = original_track.timestamps(i)
+                st.markdown(f"**#{i + 1} - {orig_start} → {orig_end}**")
                 st.text_area(
                     f"Original {i}",
-                    value=orig_sub['text'],
+                    value=original_track.texts[i],
                     height=80,
                     disabled=True,
                     key=f"orig_{i}",
@@ -840,7 +790,8 @@ if st.session_state.review_stage and not st.session_state.processed_video and no
                 )
             
             with col2:
-                st.markdown(f"**#{trans_sub['index']} - {trans_sub['start']} → {trans_sub['end']}**")
+                trans_start, trans_end = translated_track.timestamps(i)
+                st.markdown(f"**#{i + 1} - {trans_start} → {trans_end}**")
                 edited_text = st.text_area(
                     f"Translated {i}",
                     value=st.session_state.edited_translations[i],
@@ -851,7 +802,7 @@ if st.session_state.review_stage and not st.session_state.processed_video and no
                 # Update edited translation in session state
                 st.session_state.edited_translations[i] = edited_text
             
-            if i < len(st.session_state.original_subtitles_data) - 1:
+            if i < len(original_track) - 1:
                 st.markdown("---")
         
         # Approval buttons
@@ -860,18 +811,17 @@ if st.session_state.review_stage and not st.session_state.processed_video and no
         
         with col1:
             if st.button("✅ Approve and Generate Dubbed Video", type="primary", use_container_width=True):
-                # Update translated subtitles data with edited text
-                for i, sub in enumerate(st.session_state.translated_subtitles_data):
-                    sub['text'] = st.session_state.edited_translations[i]
-                
-                # Save edited subtitles
-                save_edited_subtitles(
-                    st.session_state.translated_subtitles_data,
+                # Apply the edits to the in-memory track and refresh the download copy
+                st.session_state.translated_track = save_edited_subtitles(
+                    translated_track,
+                    st.session_state.edited_translations,
                     st.session_state.translated_subtitle
                 )
                 
-                # Set flag to start stage 2 and hide review
-                st.session_state.start_stage2 = True
+                # Start stage 2 in the background and hide review
+                st.session_state.processing = True
+                reset_progress_status()
+                start_dub_job()
                 st.session_state.review_stage = False
                 st.session_state.edited_translations = {}
                 st.rerun()
@@ -924,6 +874,15 @@ if st.session_state.processed_video and os.path.exists(st.session_state.processe
     st.subheader("🎥 Preview Dubbed Video")
     st.video(st.session_state.processed_video)
     
+    # Go back to the review screen; only edited lines are re-dubbed
+    if st.button("✏️ Edit Subtitles and Re-dub"):
+        st.session_state.processed_video = None
+        st.session_state.edited_translations = dict(enumerate(st.session_state.translated_track.texts))
+        st.session_state.job_notes = []
+        reset_progress_status()
+        st.session_state.review_stage = True
+        st.rerun()
+    
     # Reset button
     if st.button("🔄 Process Another Video"):
         cleanup_temp_dir()
@@ -932,9 +891,9 @@ if st.session_state.processed_video and os.path.exists(st.session_state.processe
         st.session_state.original_subtitle = None
         st.session_state.translated_subtitle = None
         st.session_state.review_stage = False
-        st.session_state.start_stage2 = False
-        st.session_state.original_subtitles_data = []
-        st.session_state.translated_subtitles_data = []
+        st.session_state.job_notes = []
+        st.session_state.original_track = SubtitleTrack()
+        st.session_state.translated_track = SubtitleTrack()
         st.session_state.edited_translations = {}
         st.session_state.video_path = None
         st.session_state.audio_path = None
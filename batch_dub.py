@@ -0,0 +1,281 @@
+"""
+Dub a directory (or manifest) of videos without the web UI
+
+Usage:
+    python batch_dub.py VIDEOS_DIR_OR_MANIFEST --languages hi es [--jobs 2]
+                        [--source-language auto] [--output-dir dubbed] [--auto-approve]
+                        [--use-reviewed] [--single-container] [--no-pipeline]
+
+Without --auto-approve only the subtitles are produced, so they can be
+reviewed and edited; a second run with --use-reviewed then dubs from the
+edited SRT files. With --auto-approve every video is dubbed in one go,
+with transcription, translation and dubbing overlapped segment by
+segment (--no-pipeline runs them one after another instead).
+
+Each video is transcribed once and then translated and dubbed into all
+languages in parallel. With --single-container the dubs are written as
+one video with an audio track per language instead of one video each.
+
+A manifest is a text file with one video path per line (relative paths
+are resolved against the manifest's directory; blank lines and lines
+starting with # are ignored).
+
+Outputs go to OUTPUT_DIR/<video name>/<language>/ (the multi-track video
+to OUTPUT_DIR/<video name>/; videos with the same file name get a short
+hash of their path added to <video name>), and a per-file timing report to
+OUTPUT_DIR/report.csv and OUTPUT_DIR/report.json. The languages of one
+video share their timings, since the work for them overlaps.
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from utils.pipeline import (
+    PROGRESS_STEPS, ProgressReporter, create_subtitles_multi, create_dubs, create_dubs_pipelined
+)
+from utils.subtitle_track import SubtitleTrack
+
+VIDEO_EXTENSIONS = (".mp4", ".mov", ".mkv", ".m4v", ".webm", ".avi")
+
+REPORT_FIELDS = [
+    "video", "language", "status", "error", "lines", "failed_lines",
+    "subtitles_seconds", "dub_seconds", "total_seconds",
+] + [f"{step}_seconds" for step in PROGRESS_STEPS] + ["output"]
+
+
+class TimingReporter(ProgressReporter):
+    """Records how long each pipeline step takes"""
+
+    def __init__(self, owner):
+        self.owner = owner
+        self.started = {}
+        self.seconds = {}
+
+    def update_step(self, step, status):
+        now = time.perf_counter()
+        if status == "processing":
+            self.started[step] = now
+        elif status == "completed" and step in self.started:
+            self.seconds[step] = now - self.started.pop(step)
+
+
+def find_videos(source):
+    """
+    List the videos named by a directory or manifest file
+
+    Returns:
+        list: Absolute video paths
+    """
+    if os.path.isdir(source):
+        return sorted(
+            os.path.join(source, name) for name in os.listdir(source)
+            if name.lower().endswith(VIDEO_EXTENSIONS)
+        )
+
+    base = os.path.dirname(os.path.abspath(source))
+    videos = []
+    with open(source, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                video = os.path.normpath(os.path.join(base, line))
+                # A video listed twice is dubbed once
+                if video not in videos:
+                    videos.append(video)
+    return videos
+
+
+def output_names(videos):
+    """
+    Choose an output directory name for each video
+
+    The name is the file name without extension. Videos sharing a name
+    (e.g. a/intro.mp4 and b/intro.mp4 in a manifest) get a short hash of
+    their path appended, so they never write into the same directory. The
+    names only depend on the paths, so a --use-reviewed run finds the
+    directories of the earlier run.
+
+    Returns:
+        dict: Video path -> name
+    """
+    stems = {video: os.path.splitext(os.path.basename(video))[0] for video in videos}
+    counts = Counter(stem.lower() for stem in stems.values())
+    return {
+        video: stem if counts[stem.lower()] == 1
+        else f"{stem}-{hashlib.sha1(os.path.abspath(video).encode('utf-8')).hexdigest()[:8]}"
+        for video, stem in stems.items()
+    }
+
+
+def dub_languages(video_path, name, languages, source_language, output_dir, auto_approve, use_reviewed,
+                  single_container=False, pipelined=True):
+    """
+    Run the pipeline for one video and all its target languages
+
+    Audio extraction and transcription run once per video; translation
+    and dubbing then fan out to all languages in parallel. With
+    auto_approve and pipelined the stages also overlap.
+
+    Returns:
+        list: One report row per language
+    """
+    video_dir = os.path.join(output_dir, name)
+    os.makedirs(video_dir, exist_ok=True)
+    # Each video is its own owner, so the stage scheduler interleaves them fairly
+    reporter = TimingReporter(owner=video_path)
+    rows = {
+        language: {"video": video_path, "language": language, "status": "ok", "error": ""}
+        for language in languages
+    }
+    started = time.perf_counter()
+
+    try:
+        reviewed_paths = {
+            language: os.path.join(video_dir, language, f"subtitles_{language}.srt")
+            for language in languages
+        }
+        if auto_approve and pipelined and not use_reviewed:
+            subtitles, dubs = create_dubs_pipelined(
+                video_path, video_dir, languages, source_language, progress=reporter,
+                single_container=single_container
+            )
+            output_paths = move_outputs(dubs, name, video_dir, languages, single_container)
+            # Stages overlap, so there is no separate subtitles or dub time
+            for language, row in rows.items():
+                row["lines"] = len(subtitles.translations[language].track)
+                row["failed_lines"] = subtitles.translations[language].failed_lines
+                row["output"] = output_paths[language]
+            return finish_rows(rows, languages, reporter, started)
+
+        translated_tracks = {}
+        if use_reviewed:
+            for language, reviewed_path in reviewed_paths.items():
+                if os.path.exists(reviewed_path):
+                    translated_tracks[language] = SubtitleTrack.from_srt(reviewed_path)
+                    rows[language]["failed_lines"] = ""
+        missing = [language for language in languages if language not in translated_tracks]
+        if missing:
+            result = create_subtitles_multi(video_path, video_dir, missing, source_language, progress=reporter)
+            for language, translation in result.translations.items():
+                translated_tracks[language] = translation.track
+                rows[language]["failed_lines"] = translation.failed_lines
+        subtitles_seconds = round(time.perf_counter() - started, 2)
+        for language, row in rows.items():
+            row["lines"] = len(translated_tracks[language])
+            row["subtitles_seconds"] = subtitles_seconds
+
+        if auto_approve or use_reviewed:
+            dub_started = time.perf_counter()
+            dubs = create_dubs(
+                video_path, translated_tracks, video_dir, progress=reporter, single_container=single_container
+            )
+            output_paths = move_outputs(dubs, name, video_dir, languages, single_container)
+            dub_seconds = round(time.perf_counter() - dub_started, 2)
+            for language, row in rows.items():
+                row["dub_seconds"] = dub_seconds
+                row["output"] = output_paths[language]
+        else:
+            for language, row in rows.items():
+                row["output"] = reviewed_paths[language]
+    except Exception as e:
+        for row in rows.values():
+            row["status"] = "failed"
+            row["error"] = str(e)
+
+    return finish_rows(rows, languages, reporter, started)
+
+
+def move_outputs(dubs, name, video_dir, languages, single_container):
+    """
+    Give the dubbed videos their final names
+
+    Returns:
+        dict: Output path per language
+    """
+    if single_container:
+        output_path = os.path.join(video_dir, f"{name}_multi.mp4")
+        os.replace(dubs.combined_video_path, output_path)
+        return dict.fromkeys(languages, output_path)
+
+    output_paths = {}
+    for language, path in dubs.output_video_paths.items():
+        output_paths[language] = os.path.join(video_dir, language, f"{name}_{language}.mp4")
+        os.replace(path, output_paths[language])
+    return output_paths
+
+
+def finish_rows(rows, languages, reporter, started):
+    # Total and per-step times are shared by all languages of the video
+    total_seconds = round(time.perf_counter() - started, 2)
+    for row in rows.values():
+        row["total_seconds"] = total_seconds
+        for step, seconds in reporter.seconds.items():
+            row[f"{step}_seconds"] = round(seconds, 2)
+    return [rows[language] for language in languages]
+
+
+def write_report(rows, output_dir):
+    """Write the timing report as CSV and JSON"""
+    with open(os.path.join(output_dir, "report.csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS, restval="")
+        writer.writeheader()
+        writer.writerows(rows)
+    with open(os.path.join(output_dir, "report.json"), "w", encoding="utf-8") as f:
+        json.dump(rows, f, indent=2, ensure_ascii=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("source", help="Directory of videos or manifest file")
+    parser.add_argument("--languages", nargs="+", required=True, help="Target language codes, e.g. hi es")
+    parser.add_argument("--source-language", default="auto", help="Source language code (default: auto)")
+    parser.add_argument("--output-dir", default="dubbed")
+    parser.add_argument("--jobs", type=int, default=2, help="Videos processed at the same time")
+    parser.add_argument("--auto-approve", action="store_true", help="Dub without stopping for review")
+    parser.add_argument("--use-reviewed", action="store_true",
+                        help="Dub from previously written (and edited) translated subtitles")
+    parser.add_argument("--single-container", action="store_true",
+                        help="Write one video per input with an audio track per language")
+    parser.add_argument("--no-pipeline", dest="pipelined", action="store_false",
+                        help="With --auto-approve, run each stage to completion before the next")
+    args = parser.parse_args()
+
+    videos = find_videos(args.source)
+    if not videos:
+        parser.error(f"No videos found in {args.source}")
+    os.makedirs(args.output_dir, exist_ok=True)
+    names = output_names(videos)
+
+    rows = []
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as executor:
+        futures = [
+            executor.submit(dub_languages, video, names[video], args.languages, args.source_language,
+                            args.output_dir, args.auto_approve, args.use_reviewed, args.single_container,
+                            args.pipelined)
+            for video in videos
+        ]
+        for future in as_completed(futures):
+            for row in future.result():
+                rows.append(row)
+                detail = row["error"] if row["status"] == "failed" else row["output"]
+                print(f"[{len(rows)}/{len(videos) * len(args.languages)}] {row['status']:<6} "
+                      f"{row['total_seconds']:>8.1f}s  {os.path.basename(row['video'])} -> "
+                      f"{row['language']}  {detail}", flush=True)
+
+    rows.sort(key=lambda row: (row["video"], args.languages.index(row["language"])))
+    write_report(rows, args.output_dir)
+    failed = sum(row["status"] == "failed" for row in rows)
+    print(f"{len(rows) - failed} done, {failed} failed in {time.perf_counter() - started:.1f}s; "
+          f"report in {os.path.join(args.output_dir, 'report.csv')}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""
+Compare ffmpeg audio extraction against the moviepy path
+
+Usage (from the repository root):
+    python -m benchmarks.bench_audio_extraction [video.mp4] [--duration SECONDS] [--runs N]
+
+Without a video argument a synthetic test video is generated with ffmpeg.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from utils.video_processor import (
+    extract_audio, extract_audio_moviepy, run_ffmpeg
+)
+
+
+def make_test_video(path, duration):
+    """Render a synthetic 720p video with a stereo 44.1 kHz tone"""
+    run_ffmpeg([
+        "-f", "lavfi", "-i", f"testsrc=size=1280x720:rate=25:duration={duration}",
+        "-f", "lavfi", "-i", f"sine=frequency=440:sample_rate=44100:duration={duration}",
+        "-ac", "2",
+        "-c:v", "libx264", "-preset", "ultrafast",
+        "-c:a", "aac",
+        "-shortest",
+        path
+    ])
+
+
+def time_extraction(function, video_path, output_path, runs):
+    timings = []
+    for _ in range(runs):
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        start = time.perf_counter()
+        function(video_path, output_path)
+        timings.append(time.perf_counter() - start)
+    return min(timings), os.path.getsize(output_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("video", nargs="?", help="Input video (default: synthetic)")
+    parser.add_argument("--duration", type=int, default=600, help="Synthetic video length in seconds")
+    parser.add_argument("--runs", type=int, default=3, help="Repetitions per method (best is reported)")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        video_path = args.video
+        if video_path is None:
+            video_path = os.path.join(work_dir, "input.mp4")
+            print(f"Generating {args.duration}s test video...")
+            make_test_video(video_path, args.duration)
+
+        methods = [
+            ("moviepy", extract_audio_moviepy),
+            ("ffmpeg 16k mono", extract_audio),
+        ]
+        results = {}
+        for name, function in methods:
+            output_path = os.path.join(work_dir, f"{name.split()[0]}.wav")
+            results[name] = time_extraction(function, video_path, output_path, args.runs)
+
+        print(f"{'method':<18}{'seconds':>10}{'wav MB':>10}")
+        for name, (seconds, size) in results.items():
+            print(f"{name:<18}{seconds:>10.2f}{size / 1e6:>10.1f}")
+
+        baseline_seconds, baseline_size = results["moviepy"]
+        seconds, size = results["ffmpeg 16k mono"]
+        print(f"speedup: {baseline_seconds / seconds:.1f}x, disk: {baseline_size / size:.1f}x smaller")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Compare staged and overlapped (pipelined) subtitle-to-dub runs
+
+Usage (from the repository root):
+    python -m benchmarks.bench_pipelined_dub [--lines 300] [--transcribe-latency 0.01]
+                                             [--translate-latency 0.2] [--tts-latency 0.05]
+
+Transcription is simulated by a segment source that sleeps per segment,
+translation by the offline backend and speech by the local TTS backend,
+each with the given latency. The staged run finishes each stage before
+starting the next; the pipelined run connects them with bounded queues
+as create_dubs_pipelined does.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from utils.audio_generator import generate_dubbed_audio, generate_dubbed_audio_stream
+from utils.stream_fanout import FanOut
+from utils.subtitle_generator import SubtitleSegment
+from utils.subtitle_track import SubtitleTrack
+from utils.translation_backends import get_translation_backend
+from utils.translator import translate_segments, translate_track
+from utils.tts_backends import get_tts_backend
+
+
+def transcribe(lines, latency, label):
+    # Distinct texts per run, so the (on-disk) translation memory cannot help
+    label = f"{label} {time.time_ns()}"
+    for index in range(lines):
+        time.sleep(latency)
+        start = index * 3.0
+        yield SubtitleSegment(start, start + 2.5, f"{label} subtitle line number {index}")
+
+
+def run_staged(args, translation_backend, tts_backend, output_path):
+    timings = {}
+    started = time.perf_counter()
+    track = SubtitleTrack.from_segments(transcribe(args.lines, args.transcribe_latency, "staged"))
+    timings["transcription"] = time.perf_counter() - started
+
+    stage_started = time.perf_counter()
+    translated = translate_track(track, "es", backend=translation_backend)
+    timings["translation"] = time.perf_counter() - stage_started
+
+    stage_started = time.perf_counter()
+    generate_dubbed_audio(translated, output_path, "es", backend=tts_backend, use_cache=False)
+    timings["tts"] = time.perf_counter() - stage_started
+    timings["total"] = time.perf_counter() - started
+    return timings
+
+
+def run_pipelined(args, translation_backend, tts_backend, output_path):
+    started = time.perf_counter()
+    with FanOut(transcribe(args.lines, args.transcribe_latency, "pipelined"), 1) as fan_out:
+        translated = translate_segments(fan_out.streams[0], "es", backend=translation_backend)
+        generate_dubbed_audio_stream(translated, output_path, "es", backend=tts_backend, use_cache=False)
+    return {"total": time.perf_counter() - started}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=300)
+    parser.add_argument("--transcribe-latency", type=float, default=0.01, help="Seconds per segment")
+    parser.add_argument("--translate-latency", type=float, default=0.2, help="Seconds per request")
+    parser.add_argument("--tts-latency", type=float, default=0.05, help="Seconds per line")
+    args = parser.parse_args()
+
+    # Small requests, so translation streams in many batches like a long video
+    translation_backend = get_translation_backend("offline", latency=args.translate_latency, max_chars=500)
+    tts_backend = get_tts_backend("local", latency=args.tts_latency)
+    output_path = os.path.join(tempfile.mkdtemp(), "dub.wav")
+
+    staged = run_staged(args, translation_backend, tts_backend, output_path)
+    pipelined = run_pipelined(args, translation_backend, tts_backend, output_path)
+    os.remove(output_path)
+    os.rmdir(os.path.dirname(output_path))
+
+    print(f"{'':<12}{'transcribe':>12}{'translate':>12}{'tts':>12}{'total':>12}")
+    print(f"{'staged':<12}{staged['transcription']:>12.2f}{staged['translation']:>12.2f}"
+          f"{staged['tts']:>12.2f}{staged['total']:>12.2f}")
+    print(f"{'pipelined':<12}{'':>36}{pipelined['total']:>12.2f}")
+    slowest = max(staged["transcription"], staged["translation"], staged["tts"])
+    print(f"slowest stage {slowest:.2f}s, pipelined {pipelined['total']:.2f}s, "
+          f"staged {staged['total']:.2f}s ({staged['total'] / pipelined['total']:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
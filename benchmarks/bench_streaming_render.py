@@ -0,0 +1,73 @@
+"""
+Check that dubbed-audio rendering memory does not grow with video length
+
+Usage (from the repository root):
+    python -m benchmarks.bench_streaming_render [--minutes 10 120]
+
+For each length a subtitle file with one line every 3 s is rendered by
+generate_dubbed_audio with the offline TTS backend, in a fresh process,
+and that process's peak RSS is reported.
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from utils.subtitle_generator import SubtitleSegment, generate_subtitle_file
+
+
+def render(minutes):
+    from utils.audio_generator import generate_dubbed_audio
+    from utils.tts_backends import get_tts_backend
+
+    work_dir = tempfile.mkdtemp()
+    subtitle_path = os.path.join(work_dir, "subs.srt")
+    output_path = os.path.join(work_dir, "dub.wav")
+    segments = [
+        SubtitleSegment(start, start + 2.5, f"Subtitle line number {index}")
+        for index, start in enumerate(range(0, minutes * 60, 3))
+    ]
+    generate_subtitle_file(segments, subtitle_path)
+
+    start = time.perf_counter()
+    generate_dubbed_audio(
+        subtitle_path, output_path, "en",
+        backend=get_tts_backend("local", latency=0),
+        use_cache=False
+    )
+    elapsed = time.perf_counter() - start
+
+    # ru_maxrss is reported in kilobytes on Linux
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    size_mb = os.path.getsize(output_path) / 1e6
+    print(f"{minutes:>8}{len(segments):>10}{size_mb:>10.0f}{elapsed:>10.1f}{peak_mb:>12.0f}")
+    os.remove(output_path)
+    os.remove(subtitle_path)
+    os.rmdir(work_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--minutes", type=int, nargs="+", default=[10, 120])
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        render(args.child)
+        return
+
+    print(f"{'minutes':>8}{'lines':>10}{'wav MB':>10}{'seconds':>10}{'peak RSS MB':>12}")
+    sys.stdout.flush()
+    for minutes in args.minutes:
+        # A fresh interpreter per run keeps the peak RSS figures independent
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_streaming_render", "--child", str(minutes)],
+            check=True
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Compare subtitle parsing and writing in utils.subtitle_io against pysrt
+
+Usage (from the repository root):
+    python -m benchmarks.bench_subtitle_io [--cues 100000]
+
+Times parse and serialize of an SRT file with --cues entries (mixed one-
+and two-line cues, non-ASCII text, hour-plus timestamps), then checks
+round-trip fidelity: SRT written by either library must read back to the
+same cues in the other, and WebVTT must round-trip through subtitle_io.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import pysrt
+
+from utils.subtitle_io import read_cues, write_srt, write_vtt
+from utils.subtitle_track import SubtitleTrack
+
+WORDS = "the quick brown fox jumps over a lazy dog while we talk about dubbing à través del café".split()
+
+
+def make_cues(count):
+    cues = []
+    for index in range(count):
+        start = index * 2500 + index % 7
+        text = " ".join(WORDS[(index + offset) % len(WORDS)] for offset in range(3 + index % 9))
+        if index % 4 == 0:
+            text += "\n" + " ".join(WORDS[(index * 3 + offset) % len(WORDS)] for offset in range(4))
+        cues.append((start, start + 1800 + index % 500, text))
+    return cues
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def pysrt_write(path, cues):
+    subs = pysrt.SubRipFile()
+    for index, (start, end, text) in enumerate(cues, start=1):
+        subs.append(pysrt.SubRipItem(index=index, start=pysrt.SubRipTime.from_ordinal(start),
+                                     end=pysrt.SubRipTime.from_ordinal(end), text=text))
+    subs.save(path, encoding="utf-8")
+
+
+def pysrt_read(path):
+    return [(sub.start.ordinal, sub.end.ordinal, sub.text) for sub in pysrt.open(path, encoding="utf-8")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cues", type=int, default=100000)
+    args = parser.parse_args()
+
+    cues = make_cues(args.cues)
+    directory = tempfile.mkdtemp()
+    ours_path = os.path.join(directory, "subtitle_io.srt")
+    pysrt_path = os.path.join(directory, "pysrt.srt")
+    vtt_path = os.path.join(directory, "subtitle_io.vtt")
+
+    write_ours, _ = timed(lambda: write_srt(ours_path, cues))
+    write_pysrt, _ = timed(lambda: pysrt_write(pysrt_path, cues))
+    read_ours, ours_cues = timed(lambda: read_cues(pysrt_path))
+    read_pysrt, pysrt_cues = timed(lambda: pysrt_read(ours_path))
+    write_vtt_time, _ = timed(lambda: write_vtt(vtt_path, cues))
+    read_vtt_time, vtt_cues = timed(lambda: read_cues(vtt_path))
+    read_track, track = timed(lambda: SubtitleTrack.from_srt(ours_path))
+
+    size_mb = os.path.getsize(ours_path) / 1e6
+    print(f"{args.cues} cues, {size_mb:.1f} MB SRT")
+    print(f"{'operation':<16}{'pysrt s':>10}{'subtitle_io s':>15}{'speedup':>10}")
+    print(f"{'serialize':<16}{write_pysrt:>10.2f}{write_ours:>15.3f}{write_pysrt / write_ours:>9.1f}x")
+    print(f"{'parse':<16}{read_pysrt:>10.2f}{read_ours:>15.3f}{read_pysrt / read_ours:>9.1f}x")
+    print(f"{'vtt serialize':<16}{'-':>10}{write_vtt_time:>15.3f}")
+    print(f"{'vtt parse':<16}{'-':>10}{read_vtt_time:>15.3f}")
+    print(f"{'parse to track':<16}{'-':>10}{read_track:>15.3f}")
+
+    with open(ours_path, "rb") as ours, open(pysrt_path, "rb") as theirs:
+        identical = ours.read() == theirs.read().replace(b"\r\n", b"\n")
+    print(f"pysrt reads subtitle_io output: {pysrt_cues == cues}")
+    print(f"subtitle_io reads pysrt output: {ours_cues == cues}")
+    print(f"WebVTT round trip: {vtt_cues == cues}")
+    print(f"track round trip: {list(track.cues()) == cues}")
+    print(f"SRT bytes identical to pysrt: {identical}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Compare pydub's speedup() against the NumPy WSOLA time-stretch
+
+Usage (from the repository root):
+    python -m benchmarks.bench_time_stretch [--clips 200] [--rate 1.4]
+
+Clips are 1-4 s of synthetic 24 kHz mono speech-like audio, compressed
+to fit a slot 1/rate of their length, as in generate_dubbed_audio.
+"""
+import argparse
+import time
+
+import numpy as np
+from pydub import AudioSegment
+
+from utils.time_stretch import fit_to_length
+
+SAMPLE_RATE = 24000
+
+
+def make_clip(rng, seconds):
+    # Harmonic tone with a syllable-rate amplitude envelope
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    pitch = 140 + 30 * np.sin(2 * np.pi * 0.5 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+    voice = sum(np.sin(h * phase) / h for h in range(1, 6))
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 4 * t) ** 2
+    noise = 0.05 * rng.standard_normal(len(t))
+    return (0.2 * voice * envelope + noise).astype(np.float32)
+
+
+def to_segment(samples):
+    pcm = (np.clip(samples, -1, 1) * 32767).astype(np.int16)
+    return AudioSegment(pcm.tobytes(), frame_rate=SAMPLE_RATE, sample_width=2, channels=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clips", type=int, default=200)
+    parser.add_argument("--rate", type=float, default=1.4)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    clips = [make_clip(rng, rng.uniform(1.0, 4.0)) for _ in range(args.clips)]
+    segments = [to_segment(clip) for clip in clips]
+
+    start = time.perf_counter()
+    for segment in segments:
+        segment.speedup(playback_speed=args.rate)
+    pydub_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for clip in clips:
+        fit_to_length(clip, int(len(clip) / args.rate))
+    wsola_seconds = time.perf_counter() - start
+
+    print(f"{'method':<16}{'seconds':>10}{'clips/min':>12}")
+    for name, seconds in (("pydub speedup", pydub_seconds), ("numpy wsola", wsola_seconds)):
+        print(f"{name:<16}{seconds:>10.2f}{args.clips / seconds * 60:>12.0f}")
+    print(f"speedup: {pydub_seconds / wsola_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
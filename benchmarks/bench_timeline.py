@@ -0,0 +1,63 @@
+"""
+Compare dubbed-track assembly by AudioSegment appends against AudioTimeline
+
+Usage (from the repository root):
+    python -m benchmarks.bench_timeline [--counts 100 1000 10000] [--legacy-max 2000]
+
+Each segment is a 1.5 s clip placed every 2 s, as in a dense subtitle file.
+The legacy append loop is quadratic, so it is skipped above --legacy-max.
+"""
+import argparse
+import time
+
+from pydub import AudioSegment
+from pydub.generators import Sine
+
+from utils.timeline import AudioTimeline, audio_segment_to_array
+
+CLIP_MS = 1500
+SPACING_MS = 2000
+
+
+def assemble_legacy(clip, count):
+    combined = AudioSegment.silent(duration=0)
+    for index in range(count):
+        silent_duration = index * SPACING_MS - len(combined)
+        if silent_duration > 0:
+            combined += AudioSegment.silent(duration=silent_duration)
+        combined += clip
+    return combined
+
+
+def assemble_timeline(clip_samples, count):
+    timeline = AudioTimeline(count * SPACING_MS)
+    for index in range(count):
+        timeline.place(clip_samples, index * SPACING_MS, CLIP_MS)
+    return timeline
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--legacy-max", type=int, default=2000)
+    args = parser.parse_args()
+
+    clip = Sine(220, sample_rate=24000).to_audio_segment(duration=CLIP_MS).set_channels(1)
+    clip_samples = audio_segment_to_array(clip)
+
+    print(f"{'segments':>10}{'legacy s':>12}{'timeline s':>12}{'us/segment':>12}")
+    for count in args.counts:
+        legacy = "-"
+        if count <= args.legacy_max:
+            start = time.perf_counter()
+            assemble_legacy(clip, count)
+            legacy = f"{time.perf_counter() - start:.2f}"
+
+        start = time.perf_counter()
+        assemble_timeline(clip_samples, count)
+        elapsed = time.perf_counter() - start
+        print(f"{count:>10}{legacy:>12}{elapsed:>12.3f}{elapsed / count * 1e6:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
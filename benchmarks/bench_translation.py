@@ -0,0 +1,62 @@
+"""
+Measure subtitle translation throughput against the local stub server
+
+Usage (from the repository root):
+    python -m benchmarks.bench_translation [--lines 300] [--latency 0.15] [--concurrency 4]
+
+Compares one request per line with batched requests, sent one at a time
+and from the concurrent engine; no network needed.
+"""
+import argparse
+import time
+
+from benchmarks.translation_stub_server import start_stub_server
+from utils.translation_backends import HTTPBackend
+from utils.translation_engine import TranslationEngine
+from utils.translator import translate_text, translate_batch
+
+
+def make_lines(count):
+    words = "the quick brown fox jumps over a lazy dog while we talk about dubbing".split()
+    return [" ".join(words[(index + offset) % len(words)] for offset in range(4 + index % 8))
+            for index in range(count)]
+
+
+def run(name, server, function):
+    requests_before = server.requests
+    start = time.perf_counter()
+    results = function()
+    elapsed = time.perf_counter() - start
+    requests = server.requests - requests_before
+    print(f"{name:<12}{requests:>10}{elapsed:>10.2f}{len(results) / elapsed:>12.1f}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.15)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    server = start_stub_server(latency=args.latency)
+    backend = HTTPBackend(server.url, pool_size=args.concurrency)
+    sequential = TranslationEngine(backend, concurrency=1)
+    concurrent = TranslationEngine(backend, concurrency=args.concurrency)
+    lines = make_lines(args.lines)
+
+    print(f"{'mode':<12}{'requests':>10}{'seconds':>10}{'lines/s':>12}")
+    per_line = run("per-line", server, lambda: [translate_text(line, "hi", "en", backend) for line in lines])
+    batched = run("batched", server,
+                  lambda: translate_batch(lines, "hi", "en", use_memory=False, engine=sequential))
+    parallel = run("concurrent", server,
+                   lambda: translate_batch(lines, "hi", "en", use_memory=False, engine=concurrent))
+
+    expected = [line.upper() for line in lines]
+    print(f"per-line correct: {per_line == expected}, batched correct: {batched == expected}, "
+          f"concurrent correct: {parallel == expected}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
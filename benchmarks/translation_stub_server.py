@@ -0,0 +1,98 @@
+"""
+Local MyMemory-compatible translation server for offline throughput tests
+
+Usage (from the repository root):
+    python -m benchmarks.translation_stub_server [--port 8765] [--latency 0.15]
+
+Then run the app or CLI with:
+    AIDUB_TRANSLATION_BACKEND=http AIDUB_TRANSLATE_URL=http://127.0.0.1:8765/get
+
+"Translation" upper-cases the query. Each request sleeps for --latency
+seconds to simulate the network round-trip, and queries longer than
+--max-chars are rejected the way MyMemory rejects them.
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+class StubTranslationServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.15, max_chars=500):
+        super().__init__(address, StubTranslationHandler)
+        self.latency = latency
+        self.max_chars = max_chars
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/get"
+
+
+class StubTranslationHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 keeps connections alive so clients can reuse them
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        params = parse_qs(urlparse(self.path).query)
+        query = params.get("q", [""])[0]
+        with self.server.lock:
+            self.server.requests += 1
+        time.sleep(self.server.latency)
+
+        # Like MyMemory, the limit is on the UTF-8 size of the query
+        if len(query.encode("utf-8")) > self.server.max_chars:
+            payload = {
+                "responseData": {"translatedText": "QUERY LENGTH LIMIT EXCEEDED. MAX ALLOWED QUERY : 500 CHARS"},
+                "responseStatus": 403
+            }
+        else:
+            payload = {"responseData": {"translatedText": query.upper()}, "responseStatus": 200}
+
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(port=0, latency=0.15, max_chars=500):
+    """
+    Start the stub server on a background thread
+
+    Returns:
+        StubTranslationServer: Running server (call shutdown() to stop it)
+    """
+    server = StubTranslationServer(("127.0.0.1", port), latency, max_chars)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.15)
+    parser.add_argument("--max-chars", type=int, default=500)
+    args = parser.parse_args()
+
+    server = StubTranslationServer(("127.0.0.1", args.port), args.latency, args.max_chars)
+    print(f"Stub translation server on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
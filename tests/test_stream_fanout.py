@@ -0,0 +1,84 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils.stream_fanout import FanOut, StreamStopped
+
+
+def test_every_consumer_gets_every_item():
+    with FanOut(iter(range(100)), 3, maxsize=4) as fan_out:
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            results = list(executor.map(list, fan_out.streams))
+    assert results == [list(range(100))] * 3
+
+
+def test_source_error_reaches_every_consumer():
+    def source():
+        yield 1
+        raise ValueError("boom")
+
+    with FanOut(source(), 2) as fan_out:
+        for stream in fan_out.streams:
+            with pytest.raises(ValueError):
+                list(stream)
+
+
+def test_source_waits_for_slow_consumer():
+    produced = []
+
+    def source():
+        for item in range(1000):
+            produced.append(item)
+            yield item
+
+    with FanOut(source(), 1, maxsize=5) as fan_out:
+        next(fan_out.streams[0])
+        time.sleep(0.5)
+        # The queue, the item being put and the one already taken
+        assert len(produced) <= 7
+
+
+def test_failing_consumer_stops_the_others():
+    def consume(stream, fan_out, fail):
+        try:
+            for count, _ in enumerate(stream, start=1):
+                if fail and count == 2:
+                    raise RuntimeError("consumer failed")
+                time.sleep(0.01)
+        except BaseException:
+            fan_out.stop()
+            raise
+
+    finished = threading.Event()
+
+    def run():
+        with FanOut(iter(range(1000)), 2, maxsize=4) as fan_out:
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                futures = [
+                    executor.submit(consume, stream, fan_out, index == 0)
+                    for index, stream in enumerate(fan_out.streams)
+                ]
+        errors.extend(future.exception() for future in futures)
+        finished.set()
+
+    errors = []
+    threading.Thread(target=run, daemon=True).start()
+    assert finished.wait(5), "fan-out hung after a consumer failed"
+    assert isinstance(errors[0], RuntimeError)
+    assert isinstance(errors[1], StreamStopped)
+
+
+def test_source_runs_ahead_of_slow_consumer_by_default():
+    # A 2-hour video is a few thousand segments; Whisper should finish
+    # (and free its slot) while text-to-speech is still on the first one
+    finished = threading.Event()
+
+    def source():
+        yield from range(2000)
+        finished.set()
+
+    with FanOut(source(), 1) as fan_out:
+        next(fan_out.streams[0])
+        assert finished.wait(5), "source was held back by the consumer"
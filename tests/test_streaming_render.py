@@ -0,0 +1,25 @@
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# A 60-minute dub is ~170 MB of WAV; holding it in memory would exceed this many times over
+MAX_PEAK_RSS_GROWTH_MB = 30
+
+
+def peak_rss_mb(minutes):
+    # A fresh interpreter per length keeps the peak RSS figures independent
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_streaming_render", "--child", str(minutes)],
+        cwd=REPO_ROOT, check=True, capture_output=True, text=True
+    ).stdout
+    return float(output.split()[-1])
+
+
+def test_render_memory_does_not_grow_with_length():
+    short = peak_rss_mb(5)
+    long = peak_rss_mb(60)
+    assert long - short < MAX_PEAK_RSS_GROWTH_MB, (
+        f"peak RSS grew from {short:.0f} MB (5 min) to {long:.0f} MB (60 min)"
+    )
@@ -0,0 +1,84 @@
+import io
+import os
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from pydub import AudioSegment
+
+# libsndfile (>= 1.1) decodes MP3 in-process, avoiding one ffmpeg per clip
+try:
+    import soundfile
+except ImportError:
+    soundfile = None
+
+DEFAULT_DECODER_WORKERS = int(os.environ.get("AIDUB_DECODER_WORKERS", str(os.cpu_count() or 2)))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_decoder_pool():
+    """Return the process-wide decoder thread pool"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(
+                max_workers=max(1, DEFAULT_DECODER_WORKERS),
+                thread_name_prefix="audio-decoder"
+            )
+        return _pool
+
+
+def _decode_with_soundfile(data):
+    samples, sample_rate = soundfile.read(io.BytesIO(data), dtype="int16", always_2d=True)
+    return AudioSegment(
+        data=samples.tobytes(),
+        sample_width=2,
+        frame_rate=sample_rate,
+        channels=samples.shape[1]
+    )
+
+
+def _decode_with_ffmpeg(data, format):
+    # Fallback for libsndfile builds without MP3: pipe through ffmpeg,
+    # still without touching the filesystem
+    from utils.video_processor import get_ffmpeg_binary
+    command = [
+        get_ffmpeg_binary(), "-nostdin", "-hide_banner", "-loglevel", "error",
+        "-f", format, "-i", "pipe:0",
+        "-f", "wav", "pipe:1"
+    ]
+    result = subprocess.run(command, input=data, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.decode("utf-8", errors="replace").strip())
+    return AudioSegment.from_wav(io.BytesIO(result.stdout))
+
+
+def decode_audio_bytes(data, format="mp3"):
+    """
+    Decode an in-memory compressed clip
+
+    Args:
+        data: Encoded audio bytes
+        format: Container/codec name (e.g. "mp3")
+
+    Returns:
+        AudioSegment: Decoded PCM audio
+    """
+    if soundfile is not None:
+        try:
+            return _decode_with_soundfile(data)
+        except Exception:
+            pass
+    return _decode_with_ffmpeg(data, format)
+
+
+def decode_in_pool(data, format="mp3"):
+    """
+    Decode a clip on the shared decoder pool and wait for the result
+
+    Returns:
+        AudioSegment: Decoded PCM audio
+    """
+    return get_decoder_pool().submit(decode_audio_bytes, data, format).result()
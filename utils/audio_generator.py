@@ -1,87 +1,257 @@
-import pysrt
-from gtts import gTTS
-from pydub import AudioSegment
 import os
-import tempfile
+import random
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
-def generate_dubbed_audio(subtitle_path, output_audio_path, language):
+from utils.tts_backends import get_tts_backend
+from utils.tts_cache import get_clip_cache
+from utils.timeline import StreamingTimelineWriter, audio_segment_to_array
+from utils.time_stretch import fit_to_length
+from utils.render_state import RenderState
+from utils.subtitle_track import SubtitleTrack
+
+# Number of subtitle lines synthesized at the same time
+DEFAULT_TTS_CONCURRENCY = int(os.environ.get("AIDUB_TTS_CONCURRENCY", "8"))
+DEFAULT_TTS_RETRIES = 3
+
+def synthesize_with_retry(backend, text, language, retries=DEFAULT_TTS_RETRIES, backoff=0.5):
+    """
+    Synthesize one line, retrying transient failures with jittered exponential backoff
+    
+    Args:
+        backend: TTS backend instance
+        text: Text to speak
+        language: Language code for text-to-speech
+        retries: Attempts after the first failure
+        backoff: Base delay in seconds, doubled after each attempt
+        
+    Returns:
+        AudioSegment: Synthesized speech
+    """
+    for attempt in range(retries + 1):
+        try:
+            return backend.synthesize(text, language)
+        except Exception:
+            if attempt == retries:
+                raise
+            time.sleep(backoff * (2 ** attempt) * (0.5 + random.random()))
+
+def synthesize_line(backend, text, language, retries=DEFAULT_TTS_RETRIES, clip_cache=None):
+    """
+    Return speech for one line, from the clip cache when possible
+    
+    Returns:
+        tuple: (AudioSegment, True if it came from the cache)
+    """
+    if clip_cache is None:
+        return synthesize_with_retry(backend, text, language, retries), False
+    
+    key = clip_cache.make_key(text, language, backend.voice, backend.name)
+    audio = clip_cache.get(key)
+    if audio is not None:
+        return audio, True
+    
+    audio = synthesize_with_retry(backend, text, language, retries)
+    clip_cache.put(key, audio)
+    return audio, False
+
+def render_line(backend, text, language, start_ms, end_ms, slot_frames,
+                retries=DEFAULT_TTS_RETRIES, clip_cache=None, render_state=None):
+    """
+    Produce the fitted clip for one subtitle line
+    
+    The clip is reused from the previous render when the line is unchanged,
+    otherwise synthesized (or taken from the clip cache) and time-compressed
+    to its slot.
+    
+    Returns:
+        tuple: (float32 samples, source) where source is "reused", "cache" or "synthesized"
+    """
+    key = None
+    if render_state is not None:
+        key = render_state.make_key(start_ms, end_ms, text, language, backend.voice, backend.name)
+        clip = render_state.load(key)
+        if clip is not None:
+            return clip, "reused"
+    
+    audio, from_cache = synthesize_line(backend, text, language, retries, clip_cache)
+    
+    # Time-compress audio to fit the subtitle duration if needed
+    # (pitch-preserving); shorter clips are simply followed by silence
+    clip = fit_to_length(audio_segment_to_array(audio), slot_frames)
+    
+    if render_state is not None:
+        render_state.save(key, clip)
+    return clip, "cache" if from_cache else "synthesized"
+
+def generate_dubbed_audio(subtitles, output_audio_path, language, backend=None,
+                          concurrency=DEFAULT_TTS_CONCURRENCY, retries=DEFAULT_TTS_RETRIES,
+                          clip_cache=None, use_cache=True, render_dir=None):
     """
     Generate dubbed audio from translated subtitles with proper timing
     
+    Lines are synthesized concurrently on a bounded thread pool and laid
+    on the timeline strictly in subtitle order. The WAV file is written
+    in fixed-size blocks as the timeline advances, so memory use does not
+    grow with the length of the video.
+    
     Args:
-        subtitle_path: Path to translated SRT subtitle file
+        subtitles: Translated SubtitleTrack, or path to a translated SRT file
         output_audio_path: Path where dubbed audio will be saved
         language: Language code for text-to-speech
+        backend: TTS backend (default: gTTS)
+        concurrency: Maximum number of lines synthesized at once
+        retries: Retry attempts per line before falling back to silence
+        clip_cache: Clip cache to use (default: the shared on-disk cache)
+        use_cache: Set to False to always synthesize
+        render_dir: Directory holding the fitted clips of the previous render;
+            only lines that changed since then are synthesized again
+        
+    Returns:
+        dict: Per-run stats (lines, reused, cache hits, synthesized, failed,
+            seconds of speech reused)
     """
     try:
-        # Load the subtitle file
-        subs = pysrt.open(subtitle_path, encoding='utf-8')
+        # The review stage hands over the track in memory; files are read only
+        # when called with a path
+        track = subtitles if isinstance(subtitles, SubtitleTrack) else SubtitleTrack.from_srt(subtitles)
         
-        # Initialize an empty AudioSegment
-        combined = AudioSegment.silent(duration=0)
+        # Non-empty lines in timeline order; the track ends with the last subtitle
+        lines = sorted(
+            (start, end, text.strip())
+            for start, end, text in zip(track.starts, track.ends, track.texts) if text.strip()
+        )
+        return render_timeline(
+            lines, output_audio_path, language, backend, concurrency, retries,
+            clip_cache, use_cache, render_dir, total_duration=track.duration_ms()
+        )
+            
+    except Exception as e:
+        raise Exception(f"Error generating dubbed audio: {str(e)}")
+
+def generate_dubbed_audio_stream(segments, output_audio_path, language, backend=None,
+                                 concurrency=DEFAULT_TTS_CONCURRENCY, retries=DEFAULT_TTS_RETRIES,
+                                 clip_cache=None, use_cache=True, render_dir=None):
+    """
+    Generate dubbed audio from a stream of translated segments
+    
+    Like generate_dubbed_audio(), but lines are synthesized as segments
+    arrive, so dubbing starts while earlier stages are still running.
+    Segments are pulled only when a synthesis slot is free, which keeps
+    the upstream stages from running arbitrarily far ahead.
+    
+    Args:
+        segments: Iterable of segments (start, end in seconds, text) in timeline order
+        output_audio_path: Path where dubbed audio will be saved
+        language: Language code for text-to-speech
+        Other arguments as in generate_dubbed_audio()
         
-        # Create a temporary directory for intermediate audio files
-        temp_dir = tempfile.mkdtemp()
+    Returns:
+        dict: Per-run stats, as in generate_dubbed_audio()
+    """
+    try:
+        lines = (
+            (round(segment.start * 1000), round(segment.end * 1000), segment.text.strip())
+            for segment in segments if segment.text.strip()
+        )
+        return render_timeline(
+            lines, output_audio_path, language, backend, concurrency, retries,
+            clip_cache, use_cache, render_dir
+        )
+    
+    except Exception as e:
+        raise Exception(f"Error generating dubbed audio: {str(e)}")
+
+def render_timeline(lines, output_audio_path, language, backend=None,
+                    concurrency=DEFAULT_TTS_CONCURRENCY, retries=DEFAULT_TTS_RETRIES,
+                    clip_cache=None, use_cache=True, render_dir=None, total_duration=None):
+    """
+    Synthesize lines and write them onto a WAV timeline
+    
+    Args:
+        lines: Iterable of (start_ms, end_ms, text) in order of start time
+        total_duration: Length of the track in milliseconds (default: the
+            end of the last line)
+        Other arguments as in generate_dubbed_audio()
         
-        # Iterate through each subtitle
-        for index, sub in enumerate(subs):
-            start_time = sub.start.ordinal / 1000.0  # convert to seconds
-            end_time = sub.end.ordinal / 1000.0
-            text = sub.text.strip()
-            
-            if not text:
-                continue
+    Returns:
+        dict: Per-run stats
+    """
+    if backend is None:
+        backend = get_tts_backend()
+    if use_cache and clip_cache is None:
+        clip_cache = get_clip_cache()
+    elif not use_cache:
+        clip_cache = None
+    
+    render_state = RenderState(render_dir) if render_dir else None
+    
+    stats = {
+        "lines": 0, "reused": 0, "cache_hits": 0, "synthesized": 0,
+        "failed": 0, "cached_seconds": 0.0
+    }
+    
+    # Render straight to disk in fixed-size blocks as the cursor advances
+    writer = StreamingTimelineWriter(output_audio_path)
+    track_end = 0
+    
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+            # Keep a bounded number of lines in flight so finished clips
+            # never pile up in memory ahead of the writer
+            lookahead = max(1, concurrency) * 2
+            pending = deque()
+            lines = iter(lines)
             
-            # Generate speech using gTTS
-            temp_audio_path = os.path.join(temp_dir, f'temp_{index}.mp3')
+            def fill():
+                while len(pending) < lookahead:
+                    line = next(lines, None)
+                    if line is None:
+                        return
+                    line_start, line_end, line_text = line
+                    future = executor.submit(
+                        render_line, backend, line_text, language, line_start, line_end,
+                        writer.ms_to_frames(line_end - line_start), retries, clip_cache,
+                        render_state
+                    )
+                    pending.append((line, future))
             
-            try:
-                tts = gTTS(text, lang=language)
-                tts.save(temp_audio_path)
-                
-                # Load the temporary mp3 file
-                audio = AudioSegment.from_mp3(temp_audio_path)
-                
-                # Calculate the position to insert the audio
-                current_duration = len(combined)
-                silent_duration = start_time * 1000 - current_duration
-                
-                if silent_duration > 0:
-                    # Add silence to fill the gap between the current audio and the next subtitle
-                    combined += AudioSegment.silent(duration=silent_duration)
-                
-                # Calculate duration of subtitle segment
-                segment_duration = (end_time - start_time) * 1000
-                
-                # Speed up or slow down audio to fit the subtitle duration if needed
-                if len(audio) > segment_duration:
-                    # Speed up audio to fit
-                    speedup_factor = len(audio) / segment_duration
-                    audio = audio.speedup(playback_speed=speedup_factor)
-                elif len(audio) < segment_duration:
-                    # Add slight pause after audio
-                    audio = audio + AudioSegment.silent(duration=segment_duration - len(audio))
-                
-                # Append the audio to the combined AudioSegment
-                combined += audio
-                
-                # Clean up temporary file
-                if os.path.exists(temp_audio_path):
-                    os.remove(temp_audio_path)
+            # Place each line in order
+            fill()
+            while pending:
+                (start_time, end_time, text), future = pending.popleft()
+                track_end = max(track_end, end_time)
+                stats["lines"] += 1
+                try:
+                    clip, source = future.result()
+                    if source == "reused":
+                        stats["reused"] += 1
+                    elif source == "cache":
+                        stats["cache_hits"] += 1
+                    else:
+                        stats["synthesized"] += 1
+                    if source != "synthesized":
+                        stats["cached_seconds"] += len(clip) / writer.sample_rate
                     
-            except Exception as e:
-                # If TTS fails for this segment, add silence
-                segment_duration = (end_time - start_time) * 1000
-                combined += AudioSegment.silent(duration=segment_duration)
+                    # Write the clip at its offset, trimmed to its slot
+                    writer.place(clip, start_time, end_time - start_time)
+                        
+                except Exception as e:
+                    # If TTS fails for this segment, its slot stays silent
+                    stats["failed"] += 1
+                fill()
         
-        # Export the combined audio as a WAV file
-        combined.export(output_audio_path, format='wav')
-        
-        # Clean up temporary directory
-        try:
-            os.rmdir(temp_dir)
-        except:
-            pass
-            
-    except Exception as e:
-        raise Exception(f"Error generating dubbed audio: {str(e)}")
+        # Write the rest of the track and finalize the WAV header
+        writer.finish(track_end if total_duration is None else total_duration)
+    except BaseException:
+        writer.close()
+        raise
+    
+    if render_state is not None:
+        # Drop clips of lines that were edited away
+        render_state.prune()
+    
+    reused = stats["cache_hits"] + stats["reused"]
+    stats["hit_rate"] = reused / stats["lines"] if stats["lines"] else 0.0
+    return stats
@@ -0,0 +1,115 @@
+import hashlib
+import os
+import tempfile
+import unicodedata
+
+# Root for all on-disk caches; shared across sessions and processes
+CACHE_ROOT = os.environ.get(
+    "AIDUB_CACHE_DIR",
+    os.path.join(tempfile.gettempdir(), "aidub_cache")
+)
+
+
+def get_cache_dir(name):
+    """
+    Return (and create) the cache directory for one kind of cached data
+
+    Args:
+        name: Sub-directory name (e.g. "transcriptions")
+
+    Returns:
+        str: Absolute directory path
+    """
+    path = os.path.join(CACHE_ROOT, name)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def normalize_text(text):
+    """
+    Normalize text so trivially different lines share a cache entry
+
+    Applies Unicode NFC normalization and collapses whitespace.
+    """
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def file_digest(path, block_size=1024 * 1024):
+    """
+    Compute the SHA-256 digest of a file's contents
+
+    Args:
+        path: File to hash
+        block_size: Read size in bytes
+
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def touch(path):
+    """Mark a cache entry as recently used"""
+    try:
+        os.utime(path, None)
+    except OSError:
+        pass
+
+
+def directory_size(directory):
+    """
+    Return the total size of the finished cache entries in a directory
+    """
+    total = 0
+    for entry in os.scandir(directory):
+        if not entry.is_file() or entry.name.endswith(".tmp"):
+            continue
+        try:
+            total += entry.stat().st_size
+        except OSError:
+            pass
+    return total
+
+
+def enforce_size_limit(directory, max_bytes):
+    """
+    Evict least recently used files until the directory fits in max_bytes
+
+    Recency is tracked through file modification times, which cache
+    readers refresh with touch() on every hit.
+
+    Args:
+        directory: Cache directory
+        max_bytes: Size cap in bytes
+
+    Returns:
+        int: Number of files removed
+    """
+    entries = []
+    total = 0
+    for entry in os.scandir(directory):
+        # Skip non-files and entries still being written
+        if not entry.is_file() or entry.name.endswith(".tmp"):
+            continue
+        try:
+            stat = entry.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total += stat.st_size
+
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+            removed += 1
+        except OSError:
+            pass
+    return removed
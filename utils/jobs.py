@@ -0,0 +1,188 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.pipeline import PROGRESS_STEPS, ProgressReporter
+
+logger = logging.getLogger(__name__)
+
+# Jobs running at the same time across all sessions; the CPU-heavy stages
+# inside them are limited separately by the stage scheduler
+DEFAULT_JOB_WORKERS = int(os.environ.get("AIDUB_JOB_WORKERS", "16"))
+
+# Finished jobs are forgotten after this many seconds
+DEFAULT_JOB_TTL = 6 * 3600
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+class Job(ProgressReporter):
+    """
+    One background run of a pipeline stage
+
+    The worker thread updates the progress through the ProgressReporter
+    methods; the UI reads it with snapshot() on every poll.
+    """
+
+    def __init__(self, kind, owner=None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.owner = owner
+        self.status = QUEUED
+        self.progress_status = dict.fromkeys(PROGRESS_STEPS, "pending")
+        # (step, position) while waiting for a stage slot
+        self.queue = None
+        self.message = ""
+        self.percent = 0
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    def update_step(self, step, status):
+        with self._lock:
+            self.progress_status[step] = status
+
+    def update_message(self, message, percent=None):
+        with self._lock:
+            self.message = message
+            if percent is not None:
+                self.percent = percent
+
+    def update_queue(self, step, position):
+        with self._lock:
+            self.queue = (step, position) if position else None
+
+    @property
+    def done(self):
+        return self.status in (COMPLETED, FAILED)
+
+    def snapshot(self):
+        """
+        Return a consistent copy of the job's state for display
+
+        Returns:
+            dict: id, kind, status, progress_status, queue, message, percent, error
+        """
+        with self._lock:
+            return {
+                "id": self.id,
+                "kind": self.kind,
+                "status": self.status,
+                "progress_status": dict(self.progress_status),
+                "queue": self.queue,
+                "message": self.message,
+                "percent": self.percent,
+                "error": self.error,
+            }
+
+
+class JobExecutor:
+    """
+    Worker pool plus registry of background jobs
+
+    Stages submitted here run on worker threads instead of the Streamlit
+    script thread, so a session can rerun (or disconnect) without
+    breaking the work, and jobs from many sessions queue for the same
+    workers. Jobs are looked up by id on every poll.
+    """
+
+    def __init__(self, max_workers=DEFAULT_JOB_WORKERS, ttl=DEFAULT_JOB_TTL):
+        self.max_workers = max(1, max_workers)
+        self.ttl = ttl
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="aidub-job")
+
+    def submit(self, kind, function, *args, owner=None, **kwargs):
+        """
+        Queue a stage to run in the background
+
+        Args:
+            kind: Short label for the job (e.g. "subtitles", "dub")
+            function: Callable run as function(*args, progress=job, **kwargs)
+            owner: Identifier of the submitting user, for fair scheduling
+            *args, **kwargs: Arguments for function
+
+        Returns:
+            Job: The queued job
+        """
+        self.prune()
+        job = Job(kind, owner)
+        with self._lock:
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job, function, args, kwargs)
+        return job
+
+    def _run(self, job, function, args, kwargs):
+        with job._lock:
+            job.status = RUNNING
+            job.started_at = time.time()
+        try:
+            result = function(*args, progress=job, **kwargs)
+        except Exception as e:
+            logger.exception("Job %s (%s) failed", job.id, job.kind)
+            with job._lock:
+                job.error = str(e)
+                job.status = FAILED
+                job.finished_at = time.time()
+            return
+        with job._lock:
+            job.result = result
+            job.status = COMPLETED
+            job.finished_at = time.time()
+
+    def get(self, job_id):
+        """Return the job with this id, or None if it is unknown or expired"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def prune(self):
+        """
+        Forget finished jobs older than the TTL
+
+        Returns:
+            int: Number of jobs removed
+        """
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job.done and job.finished_at < cutoff
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+        return len(expired)
+
+    def stats(self):
+        """Return the number of jobs in each status"""
+        with self._lock:
+            counts = dict.fromkeys((QUEUED, RUNNING, COMPLETED, FAILED), 0)
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            return counts
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+
+# Shared executor for the whole server process
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_job_executor():
+    """Return the process-wide job executor"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = JobExecutor()
+        return _executor
@@ -0,0 +1,216 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from faster_whisper import WhisperModel
+
+from utils.scheduler import DEFAULT_STAGE_LIMITS
+
+# Approximate parameter counts (in millions) of the Whisper checkpoints,
+# used to estimate how much memory a loaded model occupies
+MODEL_PARAMETERS_MILLIONS = {
+    "tiny": 39,
+    "tiny.en": 39,
+    "base": 74,
+    "base.en": 74,
+    "small": 244,
+    "small.en": 244,
+    "medium": 769,
+    "medium.en": 769,
+    "large-v1": 1550,
+    "large-v2": 1550,
+    "large-v3": 1550,
+    "large": 1550,
+    "distil-large-v3": 756,
+    "large-v3-turbo": 809,
+    "turbo": 809,
+}
+
+# Bytes per weight for each CTranslate2 compute type
+COMPUTE_TYPE_BYTES = {
+    "int8": 1,
+    "int8_float32": 1,
+    "int8_float16": 1,
+    "int8_bfloat16": 1,
+    "int16": 2,
+    "float16": 2,
+    "bfloat16": 2,
+    "float32": 4,
+    "default": 4,
+}
+
+DEFAULT_MEMORY_BUDGET_MB = int(os.environ.get("AIDUB_WHISPER_MEMORY_MB", "2048"))
+
+# Transcriptions one shared model can decode at once. A WhisperModel runs
+# one transcribe() call per worker and queues the rest, so this matches the
+# transcription stage limit to keep concurrent jobs from serializing.
+DEFAULT_NUM_WORKERS = int(os.environ.get("AIDUB_WHISPER_WORKERS", str(DEFAULT_STAGE_LIMITS["transcription"])))
+
+
+def estimate_model_memory_mb(model_size, compute_type):
+    """
+    Estimate the resident memory of a loaded Whisper model
+
+    Args:
+        model_size: Whisper model name (e.g. "base")
+        compute_type: CTranslate2 compute type (e.g. "int8")
+
+    Returns:
+        int: Estimated size in megabytes
+    """
+    parameters = MODEL_PARAMETERS_MILLIONS.get(model_size, 1550)
+    bytes_per_weight = COMPUTE_TYPE_BYTES.get(compute_type, 4)
+    # Add headroom for the tokenizer, feature extractor and runtime buffers
+    return int(parameters * bytes_per_weight * 1.2) + 50
+
+
+class WhisperModelRegistry:
+    """
+    Process-wide cache of loaded WhisperModel instances
+
+    Models are keyed by (model_size, device, compute_type, cpu_threads,
+    num_workers) and loaded at most once per process. When loading a model would exceed the
+    memory budget, the least recently used models are evicted first.
+    """
+
+    def __init__(self, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB):
+        self.memory_budget_mb = memory_budget_mb
+        self._models = OrderedDict()
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.hits = 0
+        self.evictions = 0
+
+    def get(self, model_size="base", device="cpu", compute_type="int8", cpu_threads=0,
+            num_workers=DEFAULT_NUM_WORKERS):
+        """
+        Return a loaded model, loading it on first use
+
+        Args:
+            model_size: Whisper model name
+            device: Device to run on ("cpu", "cuda" or "auto")
+            compute_type: CTranslate2 compute type
+            cpu_threads: Number of CPU threads (0 lets CTranslate2 decide)
+            num_workers: Transcriptions the model can run in parallel
+
+        Returns:
+            WhisperModel: The cached model instance
+        """
+        key = (model_size, device, compute_type, cpu_threads, num_workers)
+
+        with self._lock:
+            entry = self._models.get(key)
+            if entry is not None:
+                # Mark as most recently used
+                self._models.move_to_end(key)
+                entry["last_used"] = time.monotonic()
+                self.hits += 1
+                return entry["model"]
+
+            size_mb = estimate_model_memory_mb(model_size, compute_type)
+            self._evict_for(size_mb)
+
+            model = WhisperModel(
+                model_size,
+                device=device,
+                compute_type=compute_type,
+                cpu_threads=cpu_threads,
+                num_workers=num_workers
+            )
+            self._models[key] = {
+                "model": model,
+                "size_mb": size_mb,
+                "last_used": time.monotonic()
+            }
+            self.loads += 1
+            return model
+
+    def warm(self, model_specs):
+        """
+        Load models ahead of the first request
+
+        Args:
+            model_specs: Iterable of (model_size, device, compute_type) tuples
+        """
+        for model_size, device, compute_type in model_specs:
+            self.get(model_size, device, compute_type)
+
+    def evict_idle(self, max_idle_seconds):
+        """
+        Drop models that have not been used for a while
+
+        Args:
+            max_idle_seconds: Models idle longer than this are unloaded
+
+        Returns:
+            int: Number of models evicted
+        """
+        now = time.monotonic()
+        with self._lock:
+            idle_keys = [
+                key for key, entry in self._models.items()
+                if now - entry["last_used"] > max_idle_seconds
+            ]
+            for key in idle_keys:
+                del self._models[key]
+            self.evictions += len(idle_keys)
+            return len(idle_keys)
+
+    def clear(self):
+        """Unload every cached model"""
+        with self._lock:
+            self._models.clear()
+
+    def memory_usage_mb(self):
+        """Return the estimated memory held by cached models"""
+        with self._lock:
+            return sum(entry["size_mb"] for entry in self._models.values())
+
+    def stats(self):
+        """Return load/hit/eviction counters and the cached model keys"""
+        with self._lock:
+            return {
+                "loaded_models": list(self._models.keys()),
+                "memory_mb": sum(entry["size_mb"] for entry in self._models.values()),
+                "memory_budget_mb": self.memory_budget_mb,
+                "loads": self.loads,
+                "hits": self.hits,
+                "evictions": self.evictions,
+            }
+
+    def _evict_for(self, size_mb):
+        # Caller holds the lock. Evict least recently used models until the
+        # new one fits; a model larger than the whole budget is still loaded.
+        used_mb = sum(entry["size_mb"] for entry in self._models.values())
+        while self._models and used_mb + size_mb > self.memory_budget_mb:
+            _, entry = self._models.popitem(last=False)
+            used_mb -= entry["size_mb"]
+            self.evictions += 1
+
+
+# Shared registry for the whole process
+_registry = WhisperModelRegistry()
+
+
+def get_registry():
+    """Return the process-wide model registry"""
+    return _registry
+
+
+def get_whisper_model(model_size="base", device="cpu", compute_type="int8", cpu_threads=0,
+                      num_workers=DEFAULT_NUM_WORKERS):
+    """
+    Return a cached WhisperModel from the process-wide registry
+    """
+    return _registry.get(model_size, device, compute_type, cpu_threads, num_workers)
+
+
+def preload_whisper_models(model_specs=(("base", "cpu", "int8"),)):
+    """
+    Warm the process-wide registry at startup
+
+    Args:
+        model_specs: Iterable of (model_size, device, compute_type) tuples
+    """
+    _registry.warm(model_specs)
@@ -0,0 +1,220 @@
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from utils.subtitle_generator import SubtitleSegment
+
+SAMPLE_RATE = 16000
+
+# Worker state, set once per worker process by _init_worker
+_worker_model_spec = None
+
+# Pools are kept alive between calls so each worker only loads its model once
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def load_audio_samples(audio):
+    """
+    Return 16 kHz mono float32 samples for a path or an existing array
+    """
+    if isinstance(audio, np.ndarray):
+        return audio.astype(np.float32, copy=False)
+    from faster_whisper import decode_audio
+    return decode_audio(audio, sampling_rate=SAMPLE_RATE)
+
+
+def find_silence_cuts(samples, target_chunk_seconds, search_seconds=5.0, frame_ms=30,
+                      sample_rate=SAMPLE_RATE):
+    """
+    Pick chunk boundaries at the quietest point near each target position
+
+    Args:
+        samples: Mono float32 samples
+        target_chunk_seconds: Desired chunk length
+        search_seconds: How far around each target to look for silence
+        frame_ms: Energy analysis frame length
+        sample_rate: Sample rate of the input
+
+    Returns:
+        list: Sample indices of boundaries, starting at 0 and ending at len(samples)
+    """
+    frame_length = int(sample_rate * frame_ms / 1000)
+    frame_count = len(samples) // frame_length
+    target_frames = int(target_chunk_seconds * 1000 / frame_ms)
+    if frame_count <= target_frames:
+        return [0, len(samples)]
+
+    # Per-frame RMS energy, computed in one vectorized pass
+    frames = samples[:frame_count * frame_length].reshape(frame_count, frame_length)
+    energy = np.sqrt(np.mean(frames * frames, axis=1))
+
+    search_frames = int(search_seconds * 1000 / frame_ms)
+    cuts = [0]
+    position = 0
+    while frame_count - position > target_frames + search_frames:
+        target = position + target_frames
+        low = max(position + 1, target - search_frames)
+        high = min(frame_count, target + search_frames)
+        cut = low + int(np.argmin(energy[low:high]))
+        cuts.append(cut * frame_length)
+        position = cut
+    cuts.append(len(samples))
+    return cuts
+
+
+def _normalize_text(text):
+    return re.sub(r"[^\w]+", " ", text.lower()).strip()
+
+
+def stitch_segments(chunk_results):
+    """
+    Merge per-chunk segments into one ordered, deduplicated list
+
+    Each chunk is transcribed with some overlap on both sides. A segment is
+    kept only by the chunk that owns its midpoint, and a segment repeating
+    the previous one's text across a seam is dropped.
+
+    Args:
+        chunk_results: List of (owned_start, owned_end, segments) in chunk order,
+            with segments already in global time
+
+    Returns:
+        list: SubtitleSegment objects in time order
+    """
+    merged = []
+    for owned_start, owned_end, segments in chunk_results:
+        for segment in segments:
+            midpoint = (segment.start + segment.end) / 2
+            if midpoint < owned_start or midpoint >= owned_end:
+                continue
+            if merged:
+                previous = merged[-1]
+                if (segment.start < previous.end + 0.5
+                        and _normalize_text(segment.text) == _normalize_text(previous.text)):
+                    continue
+                # Keep timestamps monotonic across seams
+                if segment.start < previous.end:
+                    segment = SubtitleSegment(previous.end, max(segment.end, previous.end), segment.text)
+            merged.append(segment)
+    return merged
+
+
+def _init_worker(model_size, device, compute_type, cpu_threads):
+    global _worker_model_spec
+    _worker_model_spec = (model_size, device, compute_type, cpu_threads)
+
+
+def _get_worker_model():
+    from utils.model_registry import get_whisper_model
+    # Each worker process decodes one chunk at a time
+    return get_whisper_model(*_worker_model_spec, num_workers=1)
+
+
+def _detect_language(samples):
+    """Run language detection in a worker and return the language code"""
+    model = _get_worker_model()
+    _, info = model.transcribe(samples, beam_size=1)
+    return info.language
+
+
+def _transcribe_chunk(samples, offset_seconds, language, beam_size):
+    """Transcribe one chunk in a worker and shift timestamps to global time"""
+    model = _get_worker_model()
+    segments, _ = model.transcribe(samples, beam_size=beam_size, language=language)
+    return [
+        SubtitleSegment(segment.start + offset_seconds, segment.end + offset_seconds, segment.text)
+        for segment in segments
+    ]
+
+
+def _get_pool(workers, model_size, device, compute_type, cpu_threads):
+    key = (workers, model_size, device, compute_type, cpu_threads)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            # Spawn rather than fork: the parent may already run CTranslate2
+            # or Streamlit threads that must not be duplicated
+            pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(model_size, device, compute_type, cpu_threads)
+            )
+            _pools[key] = pool
+        return pool
+
+
+def shutdown_pools():
+    """Stop all cached worker pools"""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+        _pools.clear()
+
+
+def transcribe_audio_parallel(audio, workers=None, model_size="base", device="cpu",
+                              compute_type="int8", beam_size=3, language=None,
+                              min_chunk_seconds=30.0, overlap_seconds=1.0):
+    """
+    Transcribe long audio by splitting it at silences across worker processes
+
+    Args:
+        audio: Path to an audio file or 16 kHz mono float32 samples
+        workers: Number of worker processes (default: CPU count)
+        model_size: Whisper model name
+        device: Device to run on
+        compute_type: CTranslate2 compute type
+        beam_size: Beam size for decoding
+        language: Source language code, or None to detect it once up front
+        min_chunk_seconds: Lower bound on the chunk length
+        overlap_seconds: Audio shared with each neighbouring chunk
+
+    Returns:
+        tuple: (detected_language, list of SubtitleSegment)
+    """
+    try:
+        samples = load_audio_samples(audio)
+        workers = workers or os.cpu_count() or 1
+        # Split the machine's cores between the workers
+        cpu_threads = max(1, (os.cpu_count() or 1) // workers)
+
+        duration = len(samples) / SAMPLE_RATE
+        # About two chunks per worker keeps all workers busy until the end
+        target_chunk_seconds = max(min_chunk_seconds, duration / (workers * 2))
+        cuts = find_silence_cuts(samples, target_chunk_seconds)
+
+        pool = _get_pool(workers, model_size, device, compute_type, cpu_threads)
+
+        if language is None:
+            language = pool.submit(_detect_language, samples[:30 * SAMPLE_RATE]).result()
+
+        overlap = int(overlap_seconds * SAMPLE_RATE)
+        futures = []
+        for chunk_start, chunk_end in zip(cuts[:-1], cuts[1:]):
+            padded_start = max(0, chunk_start - overlap)
+            padded_end = min(len(samples), chunk_end + overlap)
+            future = pool.submit(
+                _transcribe_chunk,
+                samples[padded_start:padded_end],
+                padded_start / SAMPLE_RATE,
+                language,
+                beam_size
+            )
+            futures.append((chunk_start / SAMPLE_RATE, chunk_end / SAMPLE_RATE, future))
+
+        # The last chunk owns everything up to the end of the audio
+        chunk_results = []
+        for index, (owned_start, owned_end, future) in enumerate(futures):
+            if index == len(futures) - 1:
+                owned_end = float("inf")
+            chunk_results.append((owned_start, owned_end, future.result()))
+
+        return language, stitch_segments(chunk_results)
+
+    except Exception as e:
+        raise Exception(f"Error during transcription: {str(e)}")
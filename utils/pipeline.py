@@ -0,0 +1,500 @@
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+
+from utils.video_processor import load_audio, replace_audio_track, mux_audio_tracks
+from utils.transcriber import (
+    transcribe_audio, transcribe_audio_stream,
+    DEFAULT_MODEL_SIZE, DEFAULT_COMPUTE_TYPE, DEFAULT_BEAM_SIZE
+)
+from utils.transcription_cache import get_transcription_cache
+from utils.subtitle_generator import stream_subtitle_file, format_time
+from utils.subtitle_track import SubtitleTrack
+from utils.segment_consolidation import consolidate_segments, CONSOLIDATE_SEGMENTS
+from utils.translator import translate_segments, translate_track
+from utils.audio_generator import generate_dubbed_audio, generate_dubbed_audio_stream
+from utils.scheduler import get_scheduler
+from utils.stream_fanout import FanOut, StreamStopped
+
+# Steps reported to the progress tracker, in pipeline order
+PROGRESS_STEPS = (
+    "audio_extraction",
+    "transcription",
+    "translation",
+    "subtitle_generation",
+    "audio_generation",
+    "video_merging",
+)
+
+# Number of worker processes for chunked parallel transcription (1 = streaming)
+TRANSCRIBE_WORKERS = int(os.environ.get("AIDUB_TRANSCRIBE_WORKERS", "1"))
+
+SubtitlesResult = namedtuple("SubtitlesResult", [
+    "video_path", "audio_path", "language",
+    "original_subtitle_path", "translated_subtitle_path",
+    "original_track", "translated_track",
+    "failed_lines", "consolidation_stats",
+])
+
+DubResult = namedtuple("DubResult", ["output_video_path", "dubbed_audio_path", "tts_stats"])
+
+# One transcription fanned out to several target languages
+MultiSubtitlesResult = namedtuple("MultiSubtitlesResult", [
+    "video_path", "audio_path", "language", "original_subtitle_path", "original_track",
+    "translations", "failed_lines", "consolidation_stats",
+])
+Translation = namedtuple("Translation", ["language", "subtitle_path", "track", "failed_lines"])
+
+MultiDubResult = namedtuple("MultiDubResult", ["output_video_paths", "combined_video_path", "tts_stats"])
+
+
+class ProgressReporter:
+    """
+    Receives progress from the pipeline stages
+
+    The stages never touch the UI; they report through one of these. This
+    base class ignores every update, for callers that do not show progress.
+    owner identifies the user for fair scheduling of the heavy stages.
+    """
+
+    owner = None
+
+    def update_step(self, step, status):
+        """Set one of PROGRESS_STEPS to pending, processing or completed"""
+
+    def update_message(self, message, percent=None):
+        """Set the status line and, optionally, the overall percentage"""
+
+    def update_queue(self, step, position):
+        """Set the queue position while waiting for a stage slot (0 once admitted)"""
+
+
+def stage_slot(step, progress):
+    """Wait for a slot of a CPU-heavy stage, reporting the queue position"""
+    return get_scheduler().slot(
+        step, progress.owner, on_wait=lambda position: progress.update_queue(step, position)
+    )
+
+
+def collect_segments(segments, track):
+    """Pass segments through while appending them to an in-memory track"""
+    for segment in segments:
+        track.append_segment(segment)
+        yield segment
+
+
+def _cache_when_done(segments, transcription_cache, cache_key, language):
+    # The cache keeps Whisper's own segmentation, stored once the stream ends
+    transcribed_track = SubtitleTrack()
+    yield from collect_segments(segments, transcribed_track)
+    transcription_cache.put(cache_key, language, transcribed_track)
+
+
+def start_transcription(video_path, work_dir, progress, stage_slots, consolidate, consolidation_stats):
+    """
+    Extract audio and start transcription, or reuse a cached transcription
+
+    Re-uploads of the same video reuse the cached transcription and skip
+    both audio extraction and Whisper. Otherwise a transcription slot is
+    entered on stage_slots and held until the caller closes it.
+
+    Returns:
+        tuple: (language, segment stream, ExtractedAudio or None)
+    """
+    progress.update_step("audio_extraction", "processing")
+
+    transcription_cache = get_transcription_cache()
+    cache_key = transcription_cache.make_key(
+        video_path, DEFAULT_MODEL_SIZE, DEFAULT_COMPUTE_TYPE, DEFAULT_BEAM_SIZE
+    )
+    cached = transcription_cache.get(cache_key)
+
+    # Audio is decoded into memory and handed to Whisper directly; the
+    # WAV copy is only written if a later stage asks for a file
+    extracted_audio = None
+    if cached is None:
+        progress.update_message("🎵 Extracting audio from video...", 20)
+        extracted_audio = load_audio(
+            video_path, wav_path=os.path.join(work_dir, "extracted_audio.wav")
+        )
+    progress.update_step("audio_extraction", "completed")
+
+    progress.update_step("transcription", "processing")
+    if cached is not None:
+        progress.update_message("⚡ Reusing cached transcription...", 40)
+        language, segments = cached
+    else:
+        # Whisper runs only in a transcription slot, held until the stream ends
+        stage_slots.enter_context(stage_slot("transcription", progress))
+        progress.update_message("📝 Transcribing audio (this may take a few minutes)...", 40)
+        if TRANSCRIBE_WORKERS > 1:
+            # Long inputs: transcribe silence-split chunks in parallel processes
+            language, segments = transcribe_audio(extracted_audio.samples, workers=TRANSCRIBE_WORKERS)
+        else:
+            language, segments = transcribe_audio_stream(extracted_audio.samples)
+        segments = _cache_when_done(segments, transcription_cache, cache_key, language)
+
+    # Optionally merge short fragments so fewer lines are translated and dubbed
+    if consolidate:
+        segments = consolidate_segments(segments, stats=consolidation_stats)
+
+    return language, segments, extracted_audio
+
+
+def create_subtitles(video_path, work_dir, target_lang, source_lang="auto", progress=None,
+                     consolidate=CONSOLIDATE_SEGMENTS):
+    """
+    Stage 1: extract audio, transcribe and translate subtitles for review
+
+    Args:
+        video_path: Path to the input video
+        work_dir: Directory for the job's intermediate and output files
+        target_lang: Target language code
+        source_lang: Source language code (default: auto-detect)
+        progress: ProgressReporter receiving step and status updates
+        consolidate: Merge short transcription fragments before translation
+
+    Returns:
+        SubtitlesResult: Tracks, file paths and per-run stats
+    """
+    progress = progress or ProgressReporter()
+    consolidation_stats = {}
+
+    with ExitStack() as stage_slots:
+        language, segments, extracted_audio = start_transcription(
+            video_path, work_dir, progress, stage_slots, consolidate, consolidation_stats
+        )
+        # Translate from the language Whisper detected: the translation
+        # services reject "auto" and the memory is keyed on the source language
+        if source_lang == "auto":
+            source_lang = language
+
+        # Transcription, translation and subtitle writing run as one stream:
+        # each segment is written to the original SRT, translated and written
+        # to the translated SRT as soon as Whisper decodes it
+        progress.update_step("subtitle_generation", "processing")
+        progress.update_step("translation", "processing")
+        original_subtitle_path = os.path.join(work_dir, f"subtitles_{language}.srt")
+        translated_subtitle_path = os.path.join(work_dir, f"subtitles_{target_lang}.srt")
+        # Both tracks are kept in memory for review and dubbing; the SRT
+        # files are only the downloadable copies
+        original_track = SubtitleTrack()
+        translated_track = SubtitleTrack()
+        original_segments = collect_segments(stream_subtitle_file(segments, original_subtitle_path), original_track)
+        translation_stats = {}
+        translated_segments = translate_segments(
+            original_segments, target_lang, source_lang, stats=translation_stats
+        )
+        translated_segments = collect_segments(translated_segments, translated_track)
+
+        for count, segment in enumerate(stream_subtitle_file(translated_segments, translated_subtitle_path), start=1):
+            progress.update_message(
+                f"🌐 {count} segments transcribed and translated "
+                f"[{format_time(segment.start)}] {segment.text}"
+            )
+
+    failed_lines = translation_stats.get("failed_lines", 0)
+
+    progress.update_step("transcription", "completed")
+    progress.update_step("translation", "completed")
+    progress.update_step("subtitle_generation", "completed")
+    progress.update_message("✅ Subtitles ready for review!", 100)
+
+    audio_path = extracted_audio.wav_path if extracted_audio and extracted_audio.wav_written else None
+    return SubtitlesResult(
+        video_path, audio_path, language,
+        original_subtitle_path, translated_subtitle_path,
+        original_track, translated_track,
+        failed_lines, consolidation_stats,
+    )
+
+
+def create_subtitles_multi(video_path, work_dir, target_langs, source_lang="auto", progress=None,
+                           consolidate=CONSOLIDATE_SEGMENTS):
+    """
+    Stage 1 for several target languages from one transcription
+
+    Audio extraction and Whisper run once; the finished transcript is then
+    translated into every target language in parallel. Each translation
+    is written to work_dir/<language>/subtitles_<language>.srt.
+
+    Args:
+        video_path: Path to the input video
+        work_dir: Directory for the job's intermediate and output files
+        target_langs: List of target language codes
+        source_lang: Source language code (default: auto-detect)
+        progress: ProgressReporter receiving step and status updates
+        consolidate: Merge short transcription fragments before translation
+
+    Returns:
+        MultiSubtitlesResult: Original track plus a Translation per language
+    """
+    progress = progress or ProgressReporter()
+    consolidation_stats = {}
+
+    with ExitStack() as stage_slots:
+        language, segments, extracted_audio = start_transcription(
+            video_path, work_dir, progress, stage_slots, consolidate, consolidation_stats
+        )
+        if source_lang == "auto":
+            source_lang = language
+        progress.update_step("subtitle_generation", "processing")
+        original_subtitle_path = os.path.join(work_dir, f"subtitles_{language}.srt")
+        original_track = SubtitleTrack()
+        for count, segment in enumerate(
+            collect_segments(stream_subtitle_file(segments, original_subtitle_path), original_track), start=1
+        ):
+            progress.update_message(f"📝 {count} segments transcribed [{format_time(segment.start)}] {segment.text}")
+    progress.update_step("transcription", "completed")
+
+    progress.update_step("translation", "processing")
+    progress.update_message(f"🌐 Translating into {len(target_langs)} languages...", 60)
+
+    def translate_one(target_lang):
+        translation_stats = {}
+        track = translate_track(original_track, target_lang, source_lang, stats=translation_stats)
+        language_dir = os.path.join(work_dir, target_lang)
+        os.makedirs(language_dir, exist_ok=True)
+        subtitle_path = os.path.join(language_dir, f"subtitles_{target_lang}.srt")
+        track.to_srt(subtitle_path)
+        return Translation(target_lang, subtitle_path, track, translation_stats.get("failed_lines", 0))
+
+    # The translation engine limits the requests in flight across all languages
+    with ThreadPoolExecutor(max_workers=max(1, len(target_langs))) as executor:
+        translations = {
+            translation.language: translation
+            for translation in executor.map(translate_one, target_langs)
+        }
+
+    failed_lines = sum(translation.failed_lines for translation in translations.values())
+    progress.update_step("translation", "completed")
+    progress.update_step("subtitle_generation", "completed")
+    progress.update_message("✅ Subtitles ready for review!", 100)
+
+    audio_path = extracted_audio.wav_path if extracted_audio and extracted_audio.wav_written else None
+    return MultiSubtitlesResult(
+        video_path, audio_path, language, original_subtitle_path, original_track,
+        translations, failed_lines, consolidation_stats,
+    )
+
+
+def _mark_subtitles_done(progress):
+    # The subtitles a dub starts from are already done
+    for step in PROGRESS_STEPS[:PROGRESS_STEPS.index("audio_generation")]:
+        progress.update_step(step, "completed")
+
+
+def _render_dub_audio(translated_track, target_lang, work_dir, progress):
+    dubbed_audio_path = os.path.join(work_dir, "dubbed_audio.wav")
+    # Fitted clips are kept per job, so a re-dub after editing only
+    # re-synthesizes the lines that changed
+    render_dir = os.path.join(work_dir, "dub_render")
+    with stage_slot("audio_generation", progress):
+        tts_stats = generate_dubbed_audio(
+            translated_track, dubbed_audio_path, target_lang, render_dir=render_dir
+        )
+    return dubbed_audio_path, tts_stats
+
+
+def create_dub(video_path, translated_track, target_lang, work_dir, progress=None):
+    """
+    Stage 2: generate dubbed audio and mux it into the final video
+
+    Args:
+        video_path: Path to the input video
+        translated_track: Reviewed SubtitleTrack in the target language
+        target_lang: Language code for text-to-speech
+        work_dir: Directory for the job's intermediate and output files
+        progress: ProgressReporter receiving step and status updates
+
+    Returns:
+        DubResult: Output paths and TTS stats
+    """
+    progress = progress or ProgressReporter()
+    _mark_subtitles_done(progress)
+
+    progress.update_step("audio_generation", "processing")
+    progress.update_message("🎤 Generating dubbed audio (this may take a few minutes)...", 30)
+    dubbed_audio_path, tts_stats = _render_dub_audio(translated_track, target_lang, work_dir, progress)
+    progress.update_step("audio_generation", "completed")
+
+    progress.update_step("video_merging", "processing")
+    progress.update_message("🎬 Creating final dubbed video...", 70)
+    output_video_path = os.path.join(work_dir, "output_dubbed_video.mp4")
+    with stage_slot("video_merging", progress):
+        replace_audio_track(video_path, dubbed_audio_path, output_video_path)
+    progress.update_step("video_merging", "completed")
+    progress.update_message("✅ Video dubbing completed successfully!", 100)
+
+    return DubResult(output_video_path, dubbed_audio_path, tts_stats)
+
+
+def create_dubs(video_path, translated_tracks, work_dir, progress=None, single_container=False):
+    """
+    Stage 2 for several target languages in parallel
+
+    Dubbed audio for every language is rendered concurrently (within the
+    scheduler's audio_generation slots) into work_dir/<language>/. The
+    results are muxed into one video per language or, with
+    single_container, into one video with an audio track per language.
+
+    Args:
+        video_path: Path to the input video
+        translated_tracks: Dict of language code -> reviewed SubtitleTrack
+        work_dir: Directory for the job's intermediate and output files
+        progress: ProgressReporter receiving step and status updates
+        single_container: Write one multi-audio video instead of one per language
+
+    Returns:
+        MultiDubResult: Output paths per language (or the combined path) and TTS stats
+    """
+    progress = progress or ProgressReporter()
+    _mark_subtitles_done(progress)
+    languages = list(translated_tracks)
+
+    progress.update_step("audio_generation", "processing")
+    progress.update_message(f"🎤 Generating dubbed audio in {len(languages)} languages...", 30)
+
+    def render(target_lang):
+        language_dir = os.path.join(work_dir, target_lang)
+        os.makedirs(language_dir, exist_ok=True)
+        return _render_dub_audio(translated_tracks[target_lang], target_lang, language_dir, progress)
+
+    with ThreadPoolExecutor(max_workers=max(1, len(languages))) as executor:
+        rendered = dict(zip(languages, executor.map(render, languages)))
+    progress.update_step("audio_generation", "completed")
+
+    return _merge_dubs(video_path, rendered, work_dir, progress, single_container)
+
+
+def _merge_dubs(video_path, rendered, work_dir, progress, single_container):
+    # rendered: language -> (dubbed audio path, tts stats), in track order
+    progress.update_step("video_merging", "processing")
+    progress.update_message("🎬 Creating final dubbed video...", 70)
+    output_video_paths = {}
+    combined_video_path = None
+    if single_container:
+        combined_video_path = os.path.join(work_dir, "output_dubbed_video.mp4")
+        with stage_slot("video_merging", progress):
+            mux_audio_tracks(
+                video_path, [(language, audio_path) for language, (audio_path, _) in rendered.items()],
+                combined_video_path
+            )
+    else:
+        for language, (audio_path, _) in rendered.items():
+            output_video_paths[language] = os.path.join(work_dir, language, "output_dubbed_video.mp4")
+            with stage_slot("video_merging", progress):
+                replace_audio_track(video_path, audio_path, output_video_paths[language])
+    progress.update_step("video_merging", "completed")
+    progress.update_message("✅ Video dubbing completed successfully!", 100)
+
+    return MultiDubResult(
+        output_video_paths, combined_video_path,
+        {language: tts_stats for language, (_, tts_stats) in rendered.items()},
+    )
+
+
+def create_dubs_pipelined(video_path, work_dir, target_langs, source_lang="auto", progress=None,
+                          consolidate=CONSOLIDATE_SEGMENTS, single_container=False):
+    """
+    Transcribe, translate and dub in one pass without review
+
+    Instead of each stage finishing before the next starts, segments flow
+    from Whisper through translation and text-to-speech onto the dubbed
+    audio timeline as soon as they are ready, so all stages run at once
+    and a long video takes about as long as its slowest stage. The
+    stages are connected by bounded queues (see FanOut) large enough that
+    Whisper can run ahead of text-to-speech and release its slot, while
+    memory stays bounded. Outputs are laid out as in create_subtitles_multi() and
+    create_dubs().
+
+    Args:
+        video_path: Path to the input video
+        work_dir: Directory for the job's intermediate and output files
+        target_langs: List of target language codes
+        source_lang: Source language code (default: auto-detect)
+        progress: ProgressReporter receiving step and status updates
+        consolidate: Merge short transcription fragments before translation
+        single_container: Write one multi-audio video instead of one per language
+
+    Returns:
+        tuple: (MultiSubtitlesResult, MultiDubResult)
+    """
+    progress = progress or ProgressReporter()
+    consolidation_stats = {}
+
+    # One render slot covers all languages of the job: the languages share
+    # one transcription stream, so none of them may wait for a slot while
+    # the others consume it. It is taken before the transcription slot, so
+    # a job waiting for a render slot never keeps a Whisper slot idle.
+    # The transcription slot is released as soon as Whisper is done, while
+    # the later stages are still catching up.
+    transcription_slots = ExitStack()
+    with stage_slot("audio_generation", progress), transcription_slots:
+        language, segments, extracted_audio = start_transcription(
+            video_path, work_dir, progress, transcription_slots, consolidate, consolidation_stats
+        )
+        if source_lang == "auto":
+            source_lang = language
+        for step in ("translation", "subtitle_generation", "audio_generation"):
+            progress.update_step(step, "processing")
+        original_subtitle_path = os.path.join(work_dir, f"subtitles_{language}.srt")
+        original_track = SubtitleTrack()
+
+        def transcribed():
+            for count, segment in enumerate(
+                collect_segments(stream_subtitle_file(segments, original_subtitle_path), original_track), start=1
+            ):
+                progress.update_message(
+                    f"⚡ {count} segments transcribed, translating and dubbing as they arrive "
+                    f"[{format_time(segment.start)}] {segment.text}"
+                )
+                yield segment
+            transcription_slots.close()
+            progress.update_step("transcription", "completed")
+
+        def dub_stream(target_lang, stream, fan_out):
+            try:
+                language_dir = os.path.join(work_dir, target_lang)
+                os.makedirs(language_dir, exist_ok=True)
+                subtitle_path = os.path.join(language_dir, f"subtitles_{target_lang}.srt")
+                track = SubtitleTrack()
+                translation_stats = {}
+                translated = translate_segments(stream, target_lang, source_lang, stats=translation_stats)
+                translated = collect_segments(stream_subtitle_file(translated, subtitle_path), track)
+                dubbed_audio_path = os.path.join(language_dir, "dubbed_audio.wav")
+                tts_stats = generate_dubbed_audio_stream(
+                    translated, dubbed_audio_path, target_lang, render_dir=os.path.join(language_dir, "dub_render")
+                )
+            except BaseException:
+                # Stop the shared stream, or the other languages would wait on it forever
+                fan_out.stop()
+                raise
+            translation = Translation(target_lang, subtitle_path, track, translation_stats.get("failed_lines", 0))
+            return translation, (dubbed_audio_path, tts_stats)
+
+        with FanOut(transcribed(), len(target_langs)) as fan_out:
+            with ThreadPoolExecutor(max_workers=max(1, len(target_langs))) as executor:
+                futures = [
+                    executor.submit(dub_stream, target_lang, stream, fan_out)
+                    for target_lang, stream in zip(target_langs, fan_out.streams)
+                ]
+        errors = [future.exception() for future in futures if future.exception() is not None]
+        if errors:
+            # Report the failure that stopped the stream, not the languages it cut short
+            raise next((e for e in errors if not isinstance(e, StreamStopped)), errors[0])
+        results = [future.result() for future in futures]
+
+    failed_lines = sum(translation.failed_lines for translation, _ in results)
+    for step in ("translation", "subtitle_generation", "audio_generation"):
+        progress.update_step(step, "completed")
+
+    audio_path = extracted_audio.wav_path if extracted_audio and extracted_audio.wav_written else None
+    subtitles = MultiSubtitlesResult(
+        video_path, audio_path, language, original_subtitle_path, original_track,
+        {translation.language: translation for translation, _ in results},
+        failed_lines, consolidation_stats,
+    )
+    rendered = {translation.language: dub for translation, dub in results}
+    return subtitles, _merge_dubs(video_path, rendered, work_dir, progress, single_container)
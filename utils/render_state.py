@@ -0,0 +1,92 @@
+import hashlib
+import os
+import threading
+
+import numpy as np
+
+from utils.cache import normalize_text
+from utils.wav_io import float_to_pcm16
+
+
+class RenderState:
+    """
+    Fitted per-line clips from the previous render of one dub
+
+    Each clip is stored already time-fitted to its subtitle slot and keyed
+    by (start, end, text, language, voice, backend). When the subtitles are
+    edited and rendered again, unchanged lines are loaded from here, while
+    edited or retimed lines are synthesized and fitted again.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(self.directory, exist_ok=True)
+        self._used = set()
+        self._lock = threading.Lock()
+
+    def make_key(self, start_ms, end_ms, text, language, voice, backend_name):
+        """
+        Build the key of one rendered line
+
+        Returns:
+            str: Hex key
+        """
+        raw = "\x1f".join([
+            str(start_ms), str(end_ms), normalize_text(text), language, str(voice), backend_name
+        ])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _clip_path(self, key):
+        return os.path.join(self.directory, f"{key}.npy")
+
+    def load(self, key):
+        """
+        Return the fitted clip from the previous render, or None
+
+        Returns:
+            numpy.ndarray: float32 samples of shape (frames, channels)
+        """
+        with self._lock:
+            self._used.add(key)
+        try:
+            pcm = np.load(self._clip_path(key))
+        except (OSError, ValueError):
+            return None
+        return pcm.astype(np.float32) / 32767.0
+
+    def save(self, key, clip):
+        """
+        Store a fitted clip as 16-bit PCM
+
+        Args:
+            key: Key from make_key()
+            clip: float32 samples of shape (frames, channels)
+        """
+        with self._lock:
+            self._used.add(key)
+        pcm = float_to_pcm16(clip)
+        path = self._clip_path(key)
+        temp_path = f"{path}.{threading.get_ident()}.tmp.npy"
+        np.save(temp_path, pcm)
+        os.replace(temp_path, path)
+
+    def prune(self):
+        """
+        Delete clips that the latest render did not use
+
+        Returns:
+            int: Number of clips removed
+        """
+        removed = 0
+        with self._lock:
+            used = set(self._used)
+            self._used.clear()
+        for entry in os.scandir(self.directory):
+            key = entry.name[:-len(".npy")]
+            if entry.name.endswith(".npy") and key not in used:
+                try:
+                    os.remove(entry.path)
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
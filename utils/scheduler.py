@@ -0,0 +1,129 @@
+import itertools
+import os
+import threading
+from contextlib import contextmanager
+
+_CPU_COUNT = os.cpu_count() or 1
+
+# Jobs allowed inside each CPU-heavy stage at once, sized to the core count:
+# Whisper and libx264 each use several threads per job, while dubbing is
+# mostly waiting on the TTS service
+DEFAULT_STAGE_LIMITS = {
+    "transcription": int(os.environ.get("AIDUB_MAX_TRANSCRIPTIONS", str(max(1, _CPU_COUNT // 4)))),
+    "audio_generation": int(os.environ.get("AIDUB_MAX_DUB_RENDERS", str(max(1, _CPU_COUNT // 2)))),
+    "video_merging": int(os.environ.get("AIDUB_MAX_ENCODES", str(max(1, _CPU_COUNT // 4)))),
+}
+
+# Seconds between queue position updates while waiting
+_WAIT_INTERVAL = 0.5
+
+
+class StageScheduler:
+    """
+    Admission control for the CPU-heavy pipeline stages
+
+    Each stage has a fixed number of slots. Jobs wait for a slot in a fair
+    queue: owners (the users' sessions) take turns, so a job whose owner
+    has been admitted to the stage fewer times goes first, and jobs of
+    equal standing keep arrival order. One user queueing many videos
+    therefore cannot starve the others, and the machine never runs more
+    Whisper or encoder jobs than it has cores for. An owner's turn count
+    is forgotten once it has nothing running or waiting in the stage.
+    """
+
+    def __init__(self, limits=None):
+        self.limits = dict(DEFAULT_STAGE_LIMITS if limits is None else limits)
+        self._running = {stage: {} for stage in self.limits}
+        self._waiting = {stage: [] for stage in self.limits}
+        self._served = {stage: {} for stage in self.limits}
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+
+    def _order(self, stage):
+        served = self._served[stage]
+        return sorted(self._waiting[stage], key=lambda ticket: (served.get(ticket[1], 0), ticket[0]))
+
+    def queue_position(self, stage, ticket):
+        """Return the 1-based position of a waiting ticket"""
+        return self._order(stage).index(ticket) + 1
+
+    def _free_slots(self, stage):
+        return self.limits[stage] - sum(self._running[stage].values())
+
+    @contextmanager
+    def slot(self, stage, owner=None, on_wait=None):
+        """
+        Hold one slot of a stage for the duration of the with block
+
+        Stages without a configured limit are not restricted.
+
+        Args:
+            stage: Stage name (a progress_status key)
+            owner: Identifier of the user the job belongs to
+            on_wait: Called with the queue position while waiting, and
+                with 0 once the slot is granted
+        """
+        if stage not in self.limits:
+            yield
+            return
+
+        with self._condition:
+            ticket = (next(self._counter), owner)
+            self._waiting[stage].append(ticket)
+            try:
+                last_position = None
+                while True:
+                    position = self.queue_position(stage, ticket)
+                    if position <= self._free_slots(stage):
+                        break
+                    if on_wait and position != last_position:
+                        on_wait(position)
+                        last_position = position
+                    self._condition.wait(_WAIT_INTERVAL)
+            finally:
+                self._waiting[stage].remove(ticket)
+            running = self._running[stage]
+            running[owner] = running.get(owner, 0) + 1
+            served = self._served[stage]
+            served[owner] = served.get(owner, 0) + 1
+            # Others move up a place
+            self._condition.notify_all()
+
+        if on_wait:
+            on_wait(0)
+        try:
+            yield
+        finally:
+            with self._condition:
+                running[owner] -= 1
+                if not running[owner]:
+                    del running[owner]
+                    if not any(ticket[1] == owner for ticket in self._waiting[stage]):
+                        del served[owner]
+                self._condition.notify_all()
+
+    def stats(self):
+        """Return running and waiting counts per stage"""
+        with self._condition:
+            return {
+                stage: {
+                    "limit": self.limits[stage],
+                    "running": sum(self._running[stage].values()),
+                    "waiting": len(self._waiting[stage]),
+                }
+                for stage in self.limits
+            }
+
+
+# Shared scheduler for the whole process
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """Return the process-wide stage scheduler"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = StageScheduler()
+        return _scheduler
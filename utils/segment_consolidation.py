@@ -0,0 +1,84 @@
+import os
+import re
+
+from utils.subtitle_generator import SubtitleSegment
+
+# Off by default; AIDUB_CONSOLIDATE_SEGMENTS=1 turns the pass on in the app
+CONSOLIDATE_SEGMENTS = os.environ.get("AIDUB_CONSOLIDATE_SEGMENTS", "0") == "1"
+
+# Limits of one merged unit
+DEFAULT_MAX_CHARS = 120
+DEFAULT_MAX_DURATION = 8.0
+DEFAULT_MAX_GAP = 0.4
+# Only units shorter than this (or followed by a fragment shorter than this) are merged
+DEFAULT_MIN_DURATION = 2.0
+
+# Text ending a sentence; merged units never cross one
+SENTENCE_END_PATTERN = re.compile(r"[.!?…。！？][\"'”’)\]]*$")
+
+
+def ends_sentence(text):
+    """Return True if text ends with sentence-final punctuation"""
+    return bool(SENTENCE_END_PATTERN.search(text.strip()))
+
+
+def consolidate_segments(segments, max_chars=DEFAULT_MAX_CHARS, max_duration=DEFAULT_MAX_DURATION,
+                         max_gap=DEFAULT_MAX_GAP, min_duration=DEFAULT_MIN_DURATION, stats=None):
+    """
+    Merge adjacent short segments into speech-sized units
+
+    Whisper often splits one sentence into several short fragments, each of
+    which would otherwise become its own translation line, TTS call and
+    time-fit. A segment is merged into the unit before it when either is
+    shorter than min_duration, the silence between them is at most
+    max_gap, the unit has not ended a sentence, and the result stays
+    within max_chars and max_duration. Works on a stream: units are
+    yielded as soon as they are closed.
+
+    Args:
+        segments: Iterable of objects with start, end (seconds) and text attributes
+        max_chars: Maximum characters in a merged unit
+        max_duration: Maximum length of a merged unit in seconds
+        max_gap: Maximum silence bridged by a merge in seconds
+        min_duration: Segments at least this long are only merged with shorter ones
+        stats: Optional dict updated with input_segments, output_segments,
+            merged (segments removed, including empty ones) and
+            tts_calls_saved
+
+    Yields:
+        SubtitleSegment: Merged segments in order
+    """
+    if stats is None:
+        stats = {}
+    stats.update(input_segments=0, output_segments=0, merged=0, tts_calls_saved=0)
+
+    current = None
+    for segment in segments:
+        stats["input_segments"] += 1
+        text = segment.text.strip()
+        if not text:
+            # Empty segments are never spoken; drop them
+            stats["merged"] += 1
+            continue
+        if current is not None:
+            merged_text = f"{current.text} {text}"
+            can_merge = (
+                (current.end - current.start < min_duration or segment.end - segment.start < min_duration)
+                and segment.start - current.end <= max_gap
+                and segment.end - current.start <= max_duration
+                and len(merged_text) <= max_chars
+                and not ends_sentence(current.text)
+            )
+            if can_merge:
+                stats["merged"] += 1
+                stats["tts_calls_saved"] += 1
+                current = SubtitleSegment(current.start, segment.end, merged_text)
+                continue
+        if current is not None:
+            stats["output_segments"] += 1
+            yield current
+        current = SubtitleSegment(segment.start, segment.end, text)
+
+    if current is not None:
+        stats["output_segments"] += 1
+        yield current
@@ -0,0 +1,100 @@
+import os
+import queue
+import threading
+
+# Segments buffered between overlapped stages before the producer waits.
+# A segment is a few hundred bytes, so this stays under about 1 MB per
+# consumer while holding a couple of hours of speech: Whisper is not held
+# to TTS pace and finishes (releasing its transcription slot) early.
+PIPELINE_QUEUE_SIZE = int(os.environ.get("AIDUB_PIPELINE_QUEUE_SIZE", "4096"))
+
+# Seconds between checks for cancellation while a stage queue is full or empty
+_QUEUE_POLL_INTERVAL = 0.1
+
+
+class StreamStopped(RuntimeError):
+    """Raised in a consumer of a FanOut that was stopped before the source ended"""
+
+
+class FanOut:
+    """
+    Feed one stream to several consumers through bounded queues
+
+    The source is iterated on its own thread, so it keeps running while
+    the consumers work. It can get at most maxsize items ahead of the
+    slowest consumer before it waits, which keeps memory bounded. An
+    error in the source is raised in every consumer.
+
+    A consumer that fails must call stop(): the source then stops and
+    the other consumers raise StreamStopped instead of waiting for items
+    that will never come. Leaving the with block stops the stream and
+    waits for the source thread.
+
+    Args:
+        iterable: Source stream
+        count: Number of consumers
+        maxsize: Queue length per consumer
+    """
+
+    def __init__(self, iterable, count, maxsize=PIPELINE_QUEUE_SIZE):
+        self._iterable = iterable
+        self._queues = [queue.Queue(maxsize) for _ in range(count)]
+        self._stopped = threading.Event()
+        self._finished = threading.Event()
+        self._errors = []
+        # One iterator per consumer
+        self.streams = [self._consume(items) for items in self._queues]
+        self._thread = threading.Thread(target=self._produce, name="pipeline-source", daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        self.join()
+
+    def stop(self):
+        """Stop the source; consumers still reading raise StreamStopped"""
+        self._stopped.set()
+
+    def join(self, timeout=None):
+        """Wait for the source thread to end"""
+        self._thread.join(timeout)
+
+    def _put(self, items, item):
+        while not self._stopped.is_set():
+            try:
+                items.put(item, timeout=_QUEUE_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _produce(self):
+        try:
+            for item in self._iterable:
+                if not all(self._put(items, item) for items in self._queues):
+                    break
+        except BaseException as e:
+            self._errors.append(e)
+        finally:
+            # Close the source on this thread, so its cleanup runs here
+            close = getattr(self._iterable, "close", None)
+            if close is not None:
+                close()
+            self._finished.set()
+
+    def _consume(self, items):
+        while True:
+            if self._stopped.is_set():
+                raise StreamStopped("Stream stopped by another consumer")
+            try:
+                item = items.get(timeout=_QUEUE_POLL_INTERVAL)
+            except queue.Empty:
+                if self._finished.is_set() and items.empty():
+                    if self._errors:
+                        raise self._errors[0]
+                    return
+                continue
+            yield item
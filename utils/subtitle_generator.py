@@ -1,24 +1,40 @@
-import math
+from collections import namedtuple
+
+from utils.subtitle_io import format_timestamp, write_srt
+
+# Minimal segment shape shared by the transcription, translation and
+# subtitle stages (faster-whisper segments expose the same attributes)
+SubtitleSegment = namedtuple("SubtitleSegment", ["start", "end", "text"])
 
 def format_time(seconds):
     """
     Convert seconds to SRT timestamp format (HH:MM:SS,mmm)
     
+    Rounds to whole milliseconds first, so 4.9996 s becomes 00:00:05,000
+    and every SRT writer formats times the same way.
+    
     Args:
         seconds: Time in seconds (float)
         
     Returns:
         str: Formatted timestamp string
     """
-    hours = math.floor(seconds / 3600)
-    seconds %= 3600
-    minutes = math.floor(seconds / 60)
-    seconds %= 60
-    milliseconds = round((seconds - math.floor(seconds)) * 1000)
-    seconds = math.floor(seconds)
-    formatted_time = f"{hours:02d}:{minutes:02d}:{seconds:02d},{milliseconds:03d}"
+    return format_timestamp(round(seconds * 1000))
+
+def format_subtitle_entry(index, segment):
+    """
+    Format a single SRT entry
     
-    return formatted_time
+    Args:
+        index: 1-based subtitle number
+        segment: Object with start, end (seconds) and text attributes
+        
+    Returns:
+        str: SRT block including the trailing blank line
+    """
+    segment_start = format_time(segment.start)
+    segment_end = format_time(segment.end)
+    return f"{index}\n{segment_start} --> {segment_end}\n{segment.text.strip()}\n\n"
 
 def generate_subtitle_file(segments, output_path):
     """
@@ -29,17 +45,33 @@ def generate_subtitle_file(segments, output_path):
         output_path: Path where SRT file will be saved
     """
     try:
-        text = ""
-        for index, segment in enumerate(segments):
-            segment_start = format_time(segment.start)
-            segment_end = format_time(segment.end)
-            text += f"{str(index + 1)}\n"
-            text += f"{segment_start} --> {segment_end}\n"
-            text += f"{segment.text.strip()}\n"
-            text += "\n"
+        write_srt(output_path, (
+            (round(segment.start * 1000), round(segment.end * 1000), segment.text)
+            for segment in segments
+        ))
         
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(text)
-            
     except Exception as e:
         raise Exception(f"Error generating subtitle file: {str(e)}")
+
+def stream_subtitle_file(segments, output_path):
+    """
+    Write SRT entries as segments arrive and pass the segments through
+    
+    Each entry is flushed as soon as its segment is available, so the file
+    grows while transcription is still running and memory stays flat.
+    
+    Args:
+        segments: Iterable of segments (e.g. a streaming transcription)
+        output_path: Path where SRT file will be saved
+        
+    Yields:
+        The input segments, unchanged, after they have been written
+    """
+    try:
+        with open(output_path, "w", encoding="utf-8") as f:
+            for index, segment in enumerate(segments):
+                f.write(format_subtitle_entry(index + 1, segment))
+                f.flush()
+                yield segment
+    except OSError as e:
+        raise Exception(f"Error generating subtitle file: {str(e)}")
@@ -0,0 +1,152 @@
+import re
+
+# Cue timing line shared by SRT and WebVTT; hours are optional in WebVTT,
+# and anything after the end time (WebVTT cue settings) is ignored
+TIMING_PATTERN = re.compile(
+    r"(?:(\d+):)?(\d{1,2}):(\d{1,2})[,.](\d{1,3})\s*-->\s*(?:(\d+):)?(\d{1,2}):(\d{1,2})[,.](\d{1,3})"
+)
+
+# Buffer size for reading and writing subtitle files
+BUFFER_SIZE = 1 << 20
+
+
+def format_timestamp(milliseconds, separator=","):
+    """
+    Convert integer milliseconds to an SRT timestamp (HH:MM:SS,mmm)
+
+    Args:
+        milliseconds: Time in milliseconds
+        separator: Character before the milliseconds ("," for SRT, "." for WebVTT)
+
+    Returns:
+        str: Formatted timestamp string
+    """
+    hours, rest = divmod(int(milliseconds), 3600000)
+    minutes, rest = divmod(rest, 60000)
+    seconds, millis = divmod(rest, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}{separator}{millis:03d}"
+
+
+def _to_milliseconds(hours, minutes, seconds, millis):
+    # "5" after the separator means 500 ms, as in pysrt
+    return ((int(hours or 0) * 60 + int(minutes)) * 60 + int(seconds)) * 1000 + int(millis.ljust(3, "0"))
+
+
+def _parse_block(lines):
+    for position, line in enumerate(lines):
+        if "-->" not in line:
+            continue
+        match = TIMING_PATTERN.search(line)
+        if match is None:
+            return None
+        groups = match.groups()
+        return (
+            _to_milliseconds(*groups[:4]),
+            _to_milliseconds(*groups[4:]),
+            "\n".join(lines[position + 1:])
+        )
+    return None
+
+
+def iter_cues(lines):
+    """
+    Parse SRT or WebVTT cues from an iterable of lines
+
+    Cues are yielded as soon as their block ends, so a file object can be
+    parsed without holding it in memory. Blocks without a timing line
+    (cue numbers alone, the WEBVTT header, NOTE and STYLE blocks) are
+    skipped.
+
+    Args:
+        lines: Iterable of text lines, e.g. an open file
+
+    Yields:
+        tuple: (start_ms, end_ms, text)
+    """
+    block = []
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line.strip():
+            block.append(line)
+        elif block:
+            cue = _parse_block(block)
+            if cue is not None:
+                yield cue
+            block = []
+    if block:
+        cue = _parse_block(block)
+        if cue is not None:
+            yield cue
+
+
+def read_cues(path):
+    """
+    Read all cues of an SRT or WebVTT file
+
+    Args:
+        path: Path to the subtitle file
+
+    Returns:
+        list: (start_ms, end_ms, text) tuples in file order
+    """
+    with open(path, "r", encoding="utf-8-sig", buffering=BUFFER_SIZE) as f:
+        return list(iter_cues(f))
+
+
+def serialize_srt(cues):
+    """
+    Format cues as SRT text
+
+    Args:
+        cues: Iterable of (start_ms, end_ms, text)
+
+    Returns:
+        str: SRT document
+    """
+    return "".join([
+        f"{index}\n{format_timestamp(start)} --> {format_timestamp(end)}\n{text.strip()}\n\n"
+        for index, (start, end, text) in enumerate(cues, start=1)
+    ])
+
+
+def serialize_vtt(cues):
+    """
+    Format cues as WebVTT text
+
+    Args:
+        cues: Iterable of (start_ms, end_ms, text)
+
+    Returns:
+        str: WebVTT document
+    """
+    return "WEBVTT\n\n" + "".join([
+        f"{format_timestamp(start, '.')} --> {format_timestamp(end, '.')}\n{text.strip()}\n\n"
+        for start, end, text in cues
+    ])
+
+
+def _write_text(path, text):
+    with open(path, "w", encoding="utf-8", buffering=BUFFER_SIZE) as f:
+        f.write(text)
+
+
+def write_srt(path, cues):
+    """
+    Write cues to an SRT file in a single buffered write
+
+    Args:
+        path: Path where SRT file will be saved
+        cues: Iterable of (start_ms, end_ms, text)
+    """
+    _write_text(path, serialize_srt(cues))
+
+
+def write_vtt(path, cues):
+    """
+    Write cues to a WebVTT file in a single buffered write
+
+    Args:
+        path: Path where VTT file will be saved
+        cues: Iterable of (start_ms, end_ms, text)
+    """
+    _write_text(path, serialize_vtt(cues))
@@ -0,0 +1,144 @@
+from array import array
+
+from utils.subtitle_generator import SubtitleSegment
+from utils.subtitle_io import format_timestamp, read_cues, write_srt, write_vtt
+
+
+class SubtitleTrack:
+    """
+    Compact in-memory subtitles handed from stage to stage
+
+    Start and end times are kept as integer millisecond columns in typed
+    arrays next to a plain list of texts, so a track costs a few bytes per
+    cue beyond its text and nothing has to be re-parsed between
+    transcription, translation, review and dubbing. SRT files are only
+    written where a file is actually needed (downloads, the batch CLI).
+    """
+
+    def __init__(self, starts=(), ends=(), texts=()):
+        self.starts = array("q", starts)
+        self.ends = array("q", ends)
+        self.texts = list(texts)
+        if not len(self.starts) == len(self.ends) == len(self.texts):
+            raise ValueError("Subtitle track columns must have the same length")
+
+    @classmethod
+    def from_segments(cls, segments):
+        """
+        Build a track from segments with start/end in seconds
+
+        Args:
+            segments: Iterable of objects with start, end and text attributes
+
+        Returns:
+            SubtitleTrack: New track
+        """
+        track = cls()
+        for segment in segments:
+            track.append_segment(segment)
+        return track
+
+    @classmethod
+    def from_cues(cls, cues):
+        """
+        Build a track from (start_ms, end_ms, text) tuples
+
+        Returns:
+            SubtitleTrack: New track
+        """
+        cues = list(cues)
+        return cls(
+            (cue[0] for cue in cues),
+            (cue[1] for cue in cues),
+            (cue[2] for cue in cues)
+        )
+
+    @classmethod
+    def from_srt(cls, srt_path):
+        """
+        Read an SRT (or WebVTT) file into a track
+
+        Returns:
+            SubtitleTrack: New track
+        """
+        return cls.from_cues(read_cues(srt_path))
+
+    from_vtt = from_srt
+
+    def __len__(self):
+        return len(self.texts)
+
+    def __iter__(self):
+        return self.segments()
+
+    def append(self, start_ms, end_ms, text):
+        """Add one cue with times in milliseconds"""
+        self.starts.append(int(start_ms))
+        self.ends.append(int(end_ms))
+        self.texts.append(text)
+
+    def append_segment(self, segment):
+        """Add one segment with start/end in seconds"""
+        self.append(round(segment.start * 1000), round(segment.end * 1000), segment.text.strip())
+
+    def segments(self):
+        """
+        Iterate over the cues as segments
+
+        Yields:
+            SubtitleSegment: Cue with start/end in seconds
+        """
+        for start, end, text in self.cues():
+            yield SubtitleSegment(start / 1000, end / 1000, text)
+
+    def cues(self):
+        """
+        Iterate over the cues with times in milliseconds
+
+        Yields:
+            tuple: (start_ms, end_ms, text)
+        """
+        return zip(self.starts, self.ends, self.texts)
+
+    def with_texts(self, texts):
+        """
+        Return a track with the same timing and new texts
+
+        Args:
+            texts: Sequence of strings aligned with this track
+
+        Returns:
+            SubtitleTrack: New track
+        """
+        return SubtitleTrack(self.starts, self.ends, texts)
+
+    def timestamps(self, index):
+        """
+        Return the formatted start and end of one cue
+
+        Returns:
+            tuple: (start, end) as HH:MM:SS,mmm strings
+        """
+        return format_timestamp(self.starts[index]), format_timestamp(self.ends[index])
+
+    def duration_ms(self):
+        """Return the end of the last cue in milliseconds"""
+        return max(self.ends, default=0)
+
+    def to_srt(self, output_path):
+        """
+        Write the track as an SRT file
+
+        Args:
+            output_path: Path where SRT file will be saved
+        """
+        write_srt(output_path, self.cues())
+
+    def to_vtt(self, output_path):
+        """
+        Write the track as a WebVTT file
+
+        Args:
+            output_path: Path where VTT file will be saved
+        """
+        write_vtt(output_path, self.cues())
@@ -0,0 +1,132 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Analysis frame of ~40 ms at 24 kHz with 50% overlap
+DEFAULT_FRAME_LENGTH = 960
+
+# The coarse alignment search runs on the signal decimated by this factor
+DECIMATION = 8
+
+
+def _window_norm(signal, length):
+    """Root energy of every length-sample window of signal"""
+    squared = np.concatenate([[0.0], np.cumsum(signal.astype(np.float64) ** 2)])
+    return np.sqrt(np.maximum(squared[length:] - squared[:-length], 1e-9))
+
+
+def time_stretch(samples, rate, frame_length=DEFAULT_FRAME_LENGTH, tolerance=None):
+    """
+    Change the duration of audio without changing its pitch (WSOLA)
+
+    Every output frame is taken from near its nominal position in the input,
+    shifted by up to `tolerance` samples to best continue the previous
+    frame. Frame extraction, windowing and overlap-add run as whole-array
+    NumPy operations.
+
+    Args:
+        samples: float32 array of shape (frames,) or (frames, channels)
+        rate: Speed factor; 2.0 halves the duration, 0.5 doubles it
+        frame_length: Analysis frame length in samples (even)
+        tolerance: Maximum alignment shift in samples (default: frame_length // 4)
+
+    Returns:
+        numpy.ndarray: Stretched samples, about len(samples) / rate frames long
+    """
+    if rate <= 0:
+        raise ValueError("rate must be positive")
+    samples = np.asarray(samples, dtype=np.float32)
+    mono_input = samples.ndim == 1
+    if mono_input:
+        samples = samples[:, None]
+
+    input_length = len(samples)
+    output_length = int(round(input_length / rate))
+    hop = frame_length // 2
+    if tolerance is None:
+        tolerance = frame_length // 4
+    if input_length < frame_length or output_length < hop or rate == 1.0:
+        # Too short to stretch meaningfully; resize by trimming or padding
+        result = np.zeros((output_length, samples.shape[1]), dtype=np.float32)
+        result[:min(output_length, input_length)] = samples[:output_length]
+        return result[:, 0] if mono_input else result
+
+    frame_count = output_length // hop + 2
+    nominal = np.round(np.arange(frame_count) * hop * rate).astype(np.int64)
+
+    # Pad so every search region and template stays in range
+    pad = tolerance + frame_length
+    padded = np.pad(samples, ((pad, pad + int(2 * hop * rate) + frame_length), (0, 0)))
+    guide = padded.mean(axis=1)
+    nominal += pad
+
+    # Frame k must continue frame k-1, so alignment is a short sequential
+    # recurrence. Each step scores every candidate shift with one
+    # matrix-vector product on a decimated guide signal, then refines the
+    # winner at full rate. Everything else is vectorized across frames.
+    decimated_length = len(guide) // DECIMATION * DECIMATION
+    coarse = guide[:decimated_length].reshape(-1, DECIMATION).mean(axis=1)
+    coarse_frame = frame_length // DECIMATION
+    coarse_tolerance = tolerance // DECIMATION
+    coarse_candidates = sliding_window_view(coarse, coarse_frame)
+    coarse_norm = _window_norm(coarse, coarse_frame)
+    fine_candidates = sliding_window_view(guide, frame_length)
+    fine_norm = _window_norm(guide, frame_length)
+
+    positions = nominal.copy()
+    for k in range(1, frame_count):
+        previous = (positions[k - 1] + hop) // DECIMATION
+        template = coarse[previous:previous + coarse_frame]
+        low = nominal[k] // DECIMATION - coarse_tolerance
+        scores = coarse_candidates[low:low + 2 * coarse_tolerance + 1] @ template
+        scores /= coarse_norm[low:low + 2 * coarse_tolerance + 1]
+        estimate = (low + int(np.argmax(scores))) * DECIMATION
+
+        previous = positions[k - 1] + hop
+        template = guide[previous:previous + frame_length]
+        low = estimate - DECIMATION
+        scores = fine_candidates[low:low + 2 * DECIMATION + 1] @ template
+        scores /= fine_norm[low:low + 2 * DECIMATION + 1]
+        positions[k] = low + int(np.argmax(scores))
+
+    # Gather windowed frames and overlap-add them at the synthesis hop
+    window = np.hanning(frame_length + 1)[:-1].astype(np.float32)
+    frame_index = positions[:, None] + np.arange(frame_length)
+    frames = padded[frame_index] * window[None, :, None]
+
+    channels = samples.shape[1]
+    output = np.zeros(((frame_count + 1) * hop, channels), dtype=np.float32)
+    blocks = output.reshape(frame_count + 1, hop, channels)
+    blocks[:-1] += frames[:, :hop]
+    blocks[1:] += frames[:, hop:]
+
+    # Divide out the window envelope (only differs from 1 at the edges)
+    envelope = np.zeros((frame_count + 1, hop), dtype=np.float32)
+    envelope[:-1] += window[:hop]
+    envelope[1:] += window[hop:]
+    output /= np.maximum(envelope.reshape(-1, 1), 1e-3)
+
+    result = output[:output_length]
+    if len(result) < output_length:
+        result = np.pad(result, ((0, output_length - len(result)), (0, 0)))
+    return result[:, 0] if mono_input else result
+
+
+def fit_to_length(samples, target_frames, max_rate=4.0):
+    """
+    Time-compress a clip so it fits in target_frames
+
+    Clips that already fit are returned unchanged. Compression is capped
+    at max_rate; anything still too long is trimmed by the caller.
+
+    Args:
+        samples: float32 array of shape (frames,) or (frames, channels)
+        target_frames: Available length in frames
+        max_rate: Highest speed-up factor applied
+
+    Returns:
+        numpy.ndarray: The (possibly) stretched samples
+    """
+    if target_frames <= 0 or len(samples) <= target_frames:
+        return samples
+    rate = min(len(samples) / target_frames, max_rate)
+    return time_stretch(samples, rate)
@@ -0,0 +1,196 @@
+import wave
+
+import numpy as np
+
+from utils.wav_io import write_wav, float_to_pcm16
+
+# gTTS produces 24 kHz mono speech, so render the dub at that rate
+DEFAULT_SAMPLE_RATE = 24000
+DEFAULT_CHANNELS = 1
+
+
+def audio_segment_to_array(audio, sample_rate=DEFAULT_SAMPLE_RATE, channels=DEFAULT_CHANNELS):
+    """
+    Convert a pydub AudioSegment to float32 samples in the timeline format
+
+    Args:
+        audio: AudioSegment to convert
+        sample_rate: Target sample rate
+        channels: Target channel count
+
+    Returns:
+        numpy.ndarray: float32 array of shape (frames, channels) in [-1, 1]
+    """
+    if audio.frame_rate != sample_rate:
+        audio = audio.set_frame_rate(sample_rate)
+    if audio.channels != channels:
+        audio = audio.set_channels(channels)
+    samples = np.array(audio.get_array_of_samples(), dtype=np.float32)
+    samples /= float(1 << (8 * audio.sample_width - 1))
+    return samples.reshape(-1, channels)
+
+
+class AudioTimeline:
+    """
+    Fixed-length output track backed by one preallocated sample buffer
+
+    Clips are written (or mixed) directly at their offsets, so assembling
+    N clips costs O(total samples) instead of re-copying a growing track
+    for every append.
+    """
+
+    def __init__(self, duration_ms, sample_rate=DEFAULT_SAMPLE_RATE, channels=DEFAULT_CHANNELS):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        frames = int(round(duration_ms * sample_rate / 1000.0))
+        self.buffer = np.zeros((frames, channels), dtype=np.float32)
+
+    def __len__(self):
+        """Length in frames"""
+        return len(self.buffer)
+
+    @property
+    def duration_ms(self):
+        return len(self.buffer) * 1000.0 / self.sample_rate
+
+    def ms_to_frames(self, milliseconds):
+        return int(round(milliseconds * self.sample_rate / 1000.0))
+
+    def place(self, samples, start_ms, max_duration_ms=None, mix=True):
+        """
+        Write a clip onto the timeline
+
+        Args:
+            samples: float32 array of shape (frames, channels)
+            start_ms: Offset of the clip in milliseconds
+            max_duration_ms: Trim the clip to this length (e.g. its subtitle slot)
+            mix: Add to existing audio instead of overwriting it
+
+        Returns:
+            int: Number of frames written
+        """
+        start = self.ms_to_frames(start_ms)
+        if start >= len(self.buffer):
+            return 0
+        length = len(samples)
+        if max_duration_ms is not None:
+            length = min(length, self.ms_to_frames(max_duration_ms))
+        length = min(length, len(self.buffer) - start)
+        if length <= 0:
+            return 0
+
+        target = self.buffer[start:start + length]
+        if mix:
+            target += samples[:length]
+        else:
+            target[:] = samples[:length]
+        return length
+
+    def write_wav(self, path):
+        """Export the timeline as a 16-bit PCM WAV file"""
+        write_wav(path, self.buffer, self.sample_rate)
+
+
+class StreamingTimelineWriter:
+    """
+    Output track rendered straight to a WAV file in fixed-size blocks
+
+    Only a window starting at the write cursor is kept in memory. Clips must
+    be placed in order of their start time; every block that ends before
+    the latest clip start can no longer change and is written out. Memory
+    use therefore depends on the block size and the longest clip, not on
+    the length of the video.
+    """
+
+    def __init__(self, path, sample_rate=DEFAULT_SAMPLE_RATE, channels=DEFAULT_CHANNELS,
+                 block_frames=65536):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.block_frames = block_frames
+        self._window = np.zeros((block_frames * 2, channels), dtype=np.float32)
+        # Absolute frame index of window[0]; everything before it is on disk
+        self._written = 0
+        self._wav_file = wave.open(path, "wb")
+        self._wav_file.setnchannels(channels)
+        self._wav_file.setsampwidth(2)
+        self._wav_file.setframerate(sample_rate)
+
+    def ms_to_frames(self, milliseconds):
+        return int(round(milliseconds * self.sample_rate / 1000.0))
+
+    @property
+    def frames_written(self):
+        return self._written
+
+    def _flush_blocks(self, until_frame):
+        # Write every complete block that lies entirely before until_frame
+        block = self.block_frames
+        while until_frame - self._written >= block:
+            self._wav_file.writeframes(float_to_pcm16(self._window[:block]).tobytes())
+            self._window[:-block] = self._window[block:]
+            self._window[-block:] = 0
+            self._written += block
+
+    def _reserve(self, end_frame):
+        # Grow the window so it reaches end_frame (only for very long clips)
+        needed = end_frame - self._written
+        if needed > len(self._window):
+            grown = np.zeros((needed + self.block_frames, self.channels), dtype=np.float32)
+            grown[:len(self._window)] = self._window
+            self._window = grown
+
+    def place(self, samples, start_ms, max_duration_ms=None, mix=True):
+        """
+        Write a clip onto the track
+
+        Args:
+            samples: float32 array of shape (frames, channels)
+            start_ms: Offset of the clip in milliseconds; must not be
+                earlier than the start of any previously placed clip
+            max_duration_ms: Trim the clip to this length (e.g. its subtitle slot)
+            mix: Add to existing audio instead of overwriting it
+
+        Returns:
+            int: Number of frames written
+        """
+        start = self.ms_to_frames(start_ms)
+        length = len(samples)
+        if max_duration_ms is not None:
+            length = min(length, self.ms_to_frames(max_duration_ms))
+
+        self._flush_blocks(start)
+        # Audio before the cursor is already on disk and cannot be changed
+        skip = max(0, self._written - start)
+        if length <= skip:
+            return 0
+        offset = start + skip - self._written
+        self._reserve(start + length)
+
+        target = self._window[offset:offset + length - skip]
+        if mix:
+            target += samples[skip:length]
+        else:
+            target[:] = samples[skip:length]
+        return length - skip
+
+    def finish(self, total_duration_ms=None):
+        """
+        Write the remaining audio, padded or cut to total_duration_ms, and close the file
+
+        Args:
+            total_duration_ms: Final track length (default: end of the last clip window)
+        """
+        if total_duration_ms is None:
+            total_frames = self._written + len(self._window)
+        else:
+            total_frames = self.ms_to_frames(total_duration_ms)
+        self._flush_blocks(total_frames)
+        remaining = total_frames - self._written
+        if remaining > 0:
+            self._wav_file.writeframes(float_to_pcm16(self._window[:remaining]).tobytes())
+            self._written += remaining
+        self._wav_file.close()
+
+    def close(self):
+        """Close the file without writing pending audio"""
+        self._wav_file.close()
@@ -1,28 +1,73 @@
-from faster_whisper import WhisperModel
+from utils.model_registry import get_whisper_model
+from utils.parallel_transcriber import transcribe_audio_parallel
 import os
 
-def transcribe_audio(audio_path):
+DEFAULT_MODEL_SIZE = "base"
+DEFAULT_DEVICE = "cpu"
+DEFAULT_COMPUTE_TYPE = "int8"
+DEFAULT_BEAM_SIZE = 3
+
+def transcribe_audio_stream(audio_path, model_size=DEFAULT_MODEL_SIZE, device=DEFAULT_DEVICE,
+                            compute_type=DEFAULT_COMPUTE_TYPE, beam_size=DEFAULT_BEAM_SIZE):
     """
-    Transcribe audio file using faster-whisper model
+    Start a streaming transcription of an audio file
+    
+    audio_path may also be a 16 kHz mono float32 NumPy array, which
+    faster-whisper consumes without touching the disk.
+    
+    Language detection runs up front; segments are decoded lazily as the
+    returned generator is consumed, so callers can act on the first
+    segments while the rest of the file is still being transcribed.
+    
+    Returns:
+        tuple: (detected_language, segment generator)
     """
     try:
-        # Use base model for faster loading on cloud
-        model = WhisperModel("base", device="cpu", compute_type="int8")
-        
-        # Transcribe the audio
-        segments, info = model.transcribe(audio_path, beam_size=3)
-        
-        # Get detected language
-        detected_language = info.language
-        
-        # Convert generator to list
-        segments_list = list(segments)
-        
-        return detected_language, segments_list
-        
+        model = get_whisper_model(model_size, device, compute_type)
+        segments, info = model.transcribe(audio_path, beam_size=beam_size)
+    except Exception as e:
+        raise Exception(f"Error during transcription: {str(e)}")
+    
+    return info.language, _iter_segments(segments)
+
+def _iter_segments(segments):
+    """Re-raise decoding errors from the faster-whisper generator"""
+    try:
+        for segment in segments:
+            yield segment
     except Exception as e:
         raise Exception(f"Error during transcription: {str(e)}")
 
+def transcribe_audio(audio_path, model_size=DEFAULT_MODEL_SIZE, device=DEFAULT_DEVICE,
+                     compute_type=DEFAULT_COMPUTE_TYPE, beam_size=DEFAULT_BEAM_SIZE, workers=1):
+    """
+    Transcribe audio file using faster-whisper model
+    
+    The model is taken from the process-wide registry, so it is only
+    loaded on the first call for a given (size, device, compute_type).
+    With workers > 1 the audio is split at silences and transcribed in
+    parallel worker processes instead.
+    """
+    if workers > 1:
+        return transcribe_audio_parallel(
+            audio_path,
+            workers=workers,
+            model_size=model_size,
+            device=device,
+            compute_type=compute_type,
+            beam_size=beam_size
+        )
+    
+    # Use base model for faster loading on cloud
+    detected_language, segments = transcribe_audio_stream(
+        audio_path, model_size, device, compute_type, beam_size
+    )
+    
+    # Convert generator to list
+    segments_list = list(segments)
+    
+    return detected_language, segments_list
+
 def format_segment_info(segment):
     """
     Format segment information for display
@@ -0,0 +1,107 @@
+import hashlib
+import json
+import os
+import threading
+
+from utils.cache import get_cache_dir, file_digest, touch, enforce_size_limit
+from utils.subtitle_generator import SubtitleSegment
+
+DEFAULT_MAX_BYTES = int(os.environ.get("AIDUB_TRANSCRIPTION_CACHE_MB", "256")) * 1024 * 1024
+
+
+class TranscriptionCache:
+    """
+    On-disk cache of transcriptions keyed by media content and model parameters
+
+    The key is a hash of the input media bytes plus (model_size, compute_type,
+    beam_size), so re-uploading the same video for another target language
+    skips audio extraction and transcription entirely.
+    """
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory or get_cache_dir("transcriptions")
+        os.makedirs(self.directory, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def make_key(self, media_path, model_size, compute_type, beam_size):
+        """
+        Build the cache key for a media file and model configuration
+
+        Returns:
+            str: Hex key
+        """
+        params = f"{file_digest(media_path)}:{model_size}:{compute_type}:{beam_size}"
+        return hashlib.sha256(params.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        """
+        Look up a cached transcription
+
+        Returns:
+            tuple: (detected_language, list of SubtitleSegment), or None on a miss
+        """
+        path = self._entry_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        touch(path)
+        with self._lock:
+            self.hits += 1
+        segments = [SubtitleSegment(start, end, text) for start, end, text in data["segments"]]
+        return data["language"], segments
+
+    def put(self, key, language, segments):
+        """
+        Store a transcription and evict old entries beyond the size cap
+
+        Args:
+            key: Cache key from make_key()
+            language: Detected language code
+            segments: Iterable of objects with start, end and text attributes
+        """
+        data = {
+            "language": language,
+            "segments": [[segment.start, segment.end, segment.text] for segment in segments]
+        }
+        path = self._entry_path(key)
+        # Write to a temporary file first so readers never see partial entries
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+        enforce_size_limit(self.directory, self.max_bytes)
+
+    def stats(self):
+        """Return hit/miss counters"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+# Shared cache for the whole process
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_transcription_cache():
+    """Return the process-wide transcription cache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = TranscriptionCache()
+        return _cache
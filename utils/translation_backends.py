@@ -0,0 +1,175 @@
+import os
+import threading
+import time
+
+import requests
+from translate import Translator
+from translate.exceptions import TranslationError
+
+# MyMemory (the translate package's default provider) rejects queries over
+# 500 bytes of UTF-8; backends' max_chars limits are counted in bytes
+MYMEMORY_MAX_CHARS = 500
+
+# Request rate allowed against the public MyMemory service
+MYMEMORY_REQUESTS_PER_SECOND = float(os.environ.get("AIDUB_TRANSLATE_RPS", "5"))
+
+
+class PermanentTranslationError(Exception):
+    """
+    A request the service will reject every time, e.g. an over-long query
+    or an unknown language; retrying it cannot help
+    """
+
+
+def is_permanent_status(status):
+    """Return True for 4xx statuses other than timeouts and rate limits"""
+    return 400 <= status < 500 and status not in (408, 429)
+
+
+def check_response_status(data):
+    """
+    Raise if a MyMemory response reports an error
+
+    MyMemory reports errors (e.g. an over-long query) with HTTP 200 and
+    the message in place of the translation; the status may be a string.
+    """
+    status = str(data.get("responseStatus"))
+    if status == "200":
+        return
+    message = data.get("responseDetails") or data.get("responseData", {}).get("translatedText")
+    if status.isdigit() and is_permanent_status(int(status)):
+        raise PermanentTranslationError(f"Translation service error {status}: {message}")
+    raise RuntimeError(f"Translation service error {status}: {message}")
+
+
+class TranslatorBackend:
+    """
+    Translation through the translate package (MyMemory by default)
+
+    One Translator is kept per language pair instead of being rebuilt for
+    every line.
+    """
+
+    name = "translate"
+
+    def __init__(self, max_chars=MYMEMORY_MAX_CHARS, requests_per_second=MYMEMORY_REQUESTS_PER_SECOND,
+                 **translator_kwargs):
+        self.max_chars = max_chars
+        self.requests_per_second = requests_per_second
+        self._translator_kwargs = translator_kwargs
+        self._translators = {}
+        self._lock = threading.Lock()
+
+    def _get_translator(self, to_lang, from_lang):
+        key = (to_lang, from_lang)
+        with self._lock:
+            translator = self._translators.get(key)
+            if translator is None:
+                translator = Translator(to_lang=to_lang, from_lang=from_lang, **self._translator_kwargs)
+                self._translators[key] = translator
+            return translator
+
+    def translate(self, text, to_lang, from_lang="auto"):
+        """
+        Translate one request's worth of text
+
+        Returns:
+            str: Translated text
+        """
+        try:
+            return self._get_translator(to_lang, from_lang).translate(text)
+        except TranslationError as e:
+            # The provider attaches the service's response to the error
+            if getattr(e, "json", None):
+                check_response_status(e.json)
+            raise
+
+
+class HTTPBackend:
+    """
+    Translation through a MyMemory-compatible HTTP endpoint
+
+    Sends GET <base_url>?q=<text>&langpair=<from>|<to> and reads
+    responseData.translatedText, raising if responseStatus is not 200.
+    Point base_url at a local stub server to measure throughput offline.
+    """
+
+    name = "http"
+
+    def __init__(self, base_url, max_chars=MYMEMORY_MAX_CHARS, timeout=30, session=None,
+                 requests_per_second=None, pool_size=16):
+        self.base_url = base_url
+        self.max_chars = max_chars
+        self.timeout = timeout
+        self.requests_per_second = requests_per_second
+        if session is None:
+            # One keep-alive connection pool shared by all worker threads
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        self.session = session
+
+    def translate(self, text, to_lang, from_lang="auto"):
+        response = self.session.get(
+            self.base_url,
+            params={"q": text, "langpair": f"{from_lang}|{to_lang}"},
+            timeout=self.timeout
+        )
+        if is_permanent_status(response.status_code):
+            raise PermanentTranslationError(
+                f"Translation service error {response.status_code}: {response.text[:200]}"
+            )
+        response.raise_for_status()
+        data = response.json()
+        check_response_status(data)
+        return data["responseData"]["translatedText"]
+
+
+class OfflineBackend:
+    """
+    Local backend that returns text unchanged after an optional delay
+
+    Lets the translation pipeline run, and its throughput be measured,
+    without any network access.
+    """
+
+    name = "offline"
+
+    def __init__(self, latency=0.0, max_chars=MYMEMORY_MAX_CHARS, requests_per_second=None):
+        self.latency = latency
+        self.max_chars = max_chars
+        self.requests_per_second = requests_per_second
+
+    def translate(self, text, to_lang, from_lang="auto"):
+        if self.latency:
+            time.sleep(self.latency)
+        return text
+
+
+TRANSLATION_BACKENDS = {
+    TranslatorBackend.name: TranslatorBackend,
+    HTTPBackend.name: HTTPBackend,
+    OfflineBackend.name: OfflineBackend,
+}
+
+
+def get_translation_backend(name=None, **kwargs):
+    """
+    Create a translation backend by name
+
+    Defaults to AIDUB_TRANSLATION_BACKEND (or "translate"); the "http"
+    backend reads its endpoint from AIDUB_TRANSLATE_URL unless base_url
+    is given.
+
+    Returns:
+        Backend instance with name, max_chars, requests_per_second and
+        translate(text, to_lang, from_lang)
+    """
+    name = name or os.environ.get("AIDUB_TRANSLATION_BACKEND", TranslatorBackend.name)
+    if name == HTTPBackend.name and "base_url" not in kwargs:
+        kwargs["base_url"] = os.environ.get("AIDUB_TRANSLATE_URL", "https://api.mymemory.translated.net/get")
+    try:
+        return TRANSLATION_BACKENDS[name](**kwargs)
+    except KeyError:
+        raise ValueError(f"Unknown translation backend: {name}")
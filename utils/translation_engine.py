@@ -0,0 +1,255 @@
+import logging
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.translation_backends import PermanentTranslationError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TRANSLATION_CONCURRENCY = int(os.environ.get("AIDUB_TRANSLATION_CONCURRENCY", "4"))
+DEFAULT_TRANSLATION_RETRIES = 3
+
+# Lines packed into one request are joined with this separator; the split
+# pattern tolerates whitespace changes the translation service makes around it
+BATCH_SEPARATOR = "\n|||\n"
+BATCH_SPLIT_PATTERN = re.compile(r"\s*\|\s*\|\s*\|\s*")
+
+
+def request_size(text):
+    """Return the size of text in a request; MyMemory counts UTF-8 bytes"""
+    return len(text.encode("utf-8"))
+
+
+def pack_batches(texts, max_chars):
+    """
+    Group consecutive texts into batches that fit one request
+
+    Sizes are counted in UTF-8 bytes, so Devanagari, CJK or Thai lines
+    (several bytes per character) stay under the service's limit. Texts
+    containing newlines or longer than max_chars get a batch of their own.
+
+    Args:
+        texts: List of strings
+        max_chars: Size limit per request in UTF-8 bytes
+
+    Returns:
+        list: Lists of indices into texts
+    """
+    batches = []
+    current = []
+    current_length = 0
+    for index, text in enumerate(texts):
+        text_length = request_size(text)
+        added_length = text_length + (request_size(BATCH_SEPARATOR) if current else 0)
+        if "\n" in text or text_length > max_chars:
+            if current:
+                batches.append(current)
+                current, current_length = [], 0
+            batches.append([index])
+            continue
+        if current and current_length + added_length > max_chars:
+            batches.append(current)
+            current, current_length = [], 0
+            added_length = text_length
+        current.append(index)
+        current_length += added_length
+    if current:
+        batches.append(current)
+    return batches
+
+
+class RateLimiter:
+    """
+    Token bucket shared by every request to one backend
+    """
+
+    def __init__(self, requests_per_second, burst=None):
+        self.rate = requests_per_second
+        self.capacity = burst or max(1.0, requests_per_second)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+_rate_limiters = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(backend):
+    """
+    Return the process-wide rate limiter for a backend, or None if unlimited
+
+    Limiters are shared per backend name so concurrent jobs together stay
+    under the service's limit.
+    """
+    rate = getattr(backend, "requests_per_second", None)
+    if not rate:
+        return None
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(backend.name)
+        if limiter is None:
+            limiter = RateLimiter(rate)
+            _rate_limiters[backend.name] = limiter
+        return limiter
+
+
+class TranslationMetrics:
+    """
+    Thread-safe counters for translation requests and failures
+    """
+
+    FIELDS = ("requests", "retries", "failed_requests", "failed_lines", "misaligned_batches")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(self.FIELDS, 0)
+
+    def add(self, field, amount=1):
+        with self._lock:
+            self._counts[field] += amount
+
+    def snapshot(self):
+        """Return a copy of the counters"""
+        with self._lock:
+            return dict(self._counts)
+
+
+# Counters for every engine in the process
+_metrics = TranslationMetrics()
+
+
+def get_translation_metrics():
+    """Return the process-wide translation metrics"""
+    return _metrics
+
+
+class TranslationEngine:
+    """
+    Concurrent, rate-limited translation over one backend
+
+    Packed batches are sent from a thread pool. Every request passes the
+    backend's shared rate limiter and is retried with jittered exponential
+    backoff. Lines that still fail keep their original text and are
+    counted in the metrics instead of being hidden.
+    """
+
+    def __init__(self, backend, concurrency=DEFAULT_TRANSLATION_CONCURRENCY,
+                 retries=DEFAULT_TRANSLATION_RETRIES, backoff=0.5, metrics=None):
+        self.backend = backend
+        self.concurrency = max(1, concurrency)
+        self.retries = retries
+        self.backoff = backoff
+        self.metrics = metrics or _metrics
+        self._limiter = get_rate_limiter(backend)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.concurrency,
+            thread_name_prefix=f"translate-{backend.name}"
+        )
+
+    def request(self, text, to_lang, from_lang="auto"):
+        """
+        Send one request, retrying transient failures
+
+        Errors the service will repeat (PermanentTranslationError) are
+        raised at once instead of being retried.
+
+        Returns:
+            str: Translated text
+
+        Raises:
+            Exception: The last error once all retries are used up
+        """
+        for attempt in range(self.retries + 1):
+            if self._limiter:
+                self._limiter.acquire()
+            self.metrics.add("requests")
+            try:
+                return self.backend.translate(text, to_lang, from_lang)
+            except Exception as e:
+                self.metrics.add("failed_requests")
+                if attempt == self.retries or isinstance(e, PermanentTranslationError):
+                    raise
+                self.metrics.add("retries")
+                logger.debug("Translation request failed (%s), retrying", e)
+                time.sleep(self.backoff * (2 ** attempt) * (0.5 + random.random()))
+
+    def translate_one(self, text, to_lang, from_lang="auto"):
+        """
+        Translate one request's worth of text, keeping the original on failure
+
+        Returns:
+            tuple: (translated text, True if the request failed)
+        """
+        try:
+            return self.request(text, to_lang, from_lang), False
+        except Exception as e:
+            self.metrics.add("failed_lines")
+            logger.warning("Translation failed, keeping original text: %s", e)
+            return text, True
+
+    def _translate_batch(self, texts, to_lang, from_lang):
+        if len(texts) == 1:
+            translated, failed = self.translate_one(texts[0], to_lang, from_lang)
+            return [translated], [failed]
+
+        joined = BATCH_SEPARATOR.join(texts)
+        try:
+            parts = BATCH_SPLIT_PATTERN.split(self.request(joined, to_lang, from_lang).strip())
+        except Exception:
+            parts = []
+
+        if len(parts) == len(texts):
+            return [part.strip() for part in parts], [False] * len(texts)
+
+        # Misaligned (or failed) batch: fall back to one request per line
+        self.metrics.add("misaligned_batches")
+        results = [self.translate_one(text, to_lang, from_lang) for text in texts]
+        return [translated for translated, _ in results], [failed for _, failed in results]
+
+    def translate_many(self, texts, to_lang, from_lang="auto"):
+        """
+        Translate a list of lines in concurrent packed requests
+
+        Args:
+            texts: List of strings
+            to_lang: Target language code
+            from_lang: Source language code
+
+        Returns:
+            tuple: (translated strings aligned with texts, set of indices that failed)
+        """
+        batches = pack_batches(texts, self.backend.max_chars)
+        futures = [
+            self._executor.submit(self._translate_batch, [texts[index] for index in batch], to_lang, from_lang)
+            for batch in batches
+        ]
+
+        results = list(texts)
+        failed = set()
+        for batch, future in zip(batches, futures):
+            translated, batch_failed = future.result()
+            for index, text, line_failed in zip(batch, translated, batch_failed):
+                results[index] = text
+                if line_failed:
+                    failed.add(index)
+        return results, failed
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
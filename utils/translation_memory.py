@@ -0,0 +1,141 @@
+import os
+import sqlite3
+import threading
+import time
+
+from utils.cache import get_cache_dir, normalize_text
+
+DEFAULT_MAX_ENTRIES = int(os.environ.get("AIDUB_TM_MAX_ENTRIES", "200000"))
+
+# SQLite limits the number of bound parameters per statement
+_LOOKUP_CHUNK = 500
+
+
+class TranslationMemory:
+    """
+    Persistent store of past translations in a local SQLite file
+
+    Entries are keyed by (source language, target language, normalized
+    text). The file is shared by every Streamlit session and the batch
+    CLI; WAL mode lets several processes read while one writes. Once the
+    table grows past max_entries, the least recently used entries are
+    deleted.
+    """
+
+    def __init__(self, path=None, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path or os.path.join(get_cache_dir("translation_memory"), "memory.sqlite3")
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                " source_lang TEXT NOT NULL,"
+                " target_lang TEXT NOT NULL,"
+                " text TEXT NOT NULL,"
+                " translation TEXT NOT NULL,"
+                " last_used REAL NOT NULL,"
+                " uses INTEGER NOT NULL DEFAULT 1,"
+                " PRIMARY KEY (source_lang, target_lang, text))"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS translations_last_used ON translations (last_used)"
+            )
+
+    def lookup(self, texts, source_lang, target_lang):
+        """
+        Find stored translations for several texts
+
+        Args:
+            texts: Iterable of texts (normalized before lookup)
+            source_lang: Source language code
+            target_lang: Target language code
+
+        Returns:
+            dict: Normalized text -> translation, for the texts found
+        """
+        keys = list({normalize_text(text) for text in texts})
+        found = {}
+        now = time.time()
+        with self._lock, self._connection:
+            for offset in range(0, len(keys), _LOOKUP_CHUNK):
+                chunk = keys[offset:offset + _LOOKUP_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._connection.execute(
+                    f"SELECT text, translation FROM translations"
+                    f" WHERE source_lang = ? AND target_lang = ? AND text IN ({placeholders})",
+                    [source_lang, target_lang] + chunk
+                ).fetchall()
+                found.update(rows)
+            # Refresh recency for eviction
+            self._connection.executemany(
+                "UPDATE translations SET last_used = ?, uses = uses + 1"
+                " WHERE source_lang = ? AND target_lang = ? AND text = ?",
+                [(now, source_lang, target_lang, text) for text in found]
+            )
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def store(self, pairs, source_lang, target_lang):
+        """
+        Save translations and evict the oldest entries beyond max_entries
+
+        Args:
+            pairs: Iterable of (text, translation)
+            source_lang: Source language code
+            target_lang: Target language code
+        """
+        now = time.time()
+        rows = [
+            (source_lang, target_lang, normalize_text(text), translation, now)
+            for text, translation in pairs
+        ]
+        if not rows:
+            return
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO translations (source_lang, target_lang, text, translation, last_used)"
+                " VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            count = self._connection.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+            if count > self.max_entries:
+                self._connection.execute(
+                    "DELETE FROM translations WHERE rowid IN ("
+                    " SELECT rowid FROM translations ORDER BY last_used LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+
+    def stats(self):
+        """Return hit/miss counters and the number of stored entries"""
+        with self._lock:
+            entries = self._connection.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": entries,
+            }
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+# Shared memory for the whole process
+_memory = None
+_memory_lock = threading.Lock()
+
+
+def get_translation_memory():
+    """Return the process-wide translation memory"""
+    global _memory
+    with _memory_lock:
+        if _memory is None:
+            _memory = TranslationMemory()
+        return _memory
@@ -1,27 +1,147 @@
-import pysrt
-from translate import Translator
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from utils.subtitle_generator import SubtitleSegment
+from utils.subtitle_track import SubtitleTrack
+from utils.translation_backends import get_translation_backend
+from utils.translation_engine import BATCH_SEPARATOR, TranslationEngine, request_size
+from utils.translation_memory import get_translation_memory
+from utils.cache import normalize_text
 
-def translate_text(text, to_lang, from_lang="auto"):
+# One engine per backend; each keeps its clients, connection pool and
+# worker threads across calls
+_default_backend = None
+_engines = {}
+_engines_lock = threading.Lock()
+
+def get_default_backend():
+    """Return the process-wide translation backend"""
+    global _default_backend
+    with _engines_lock:
+        if _default_backend is None:
+            _default_backend = get_translation_backend()
+        return _default_backend
+
+def get_engine(backend=None):
+    """
+    Return the shared translation engine for a backend
+    
+    Args:
+        backend: Translation backend (default: shared backend)
+        
+    Returns:
+        TranslationEngine: Engine sending requests through backend
+    """
+    backend = backend or get_default_backend()
+    with _engines_lock:
+        # The engine holds the backend, so its id stays unique while cached
+        engine = _engines.get(id(backend))
+        if engine is None:
+            engine = TranslationEngine(backend)
+            _engines[id(backend)] = engine
+        return engine
+
+def translate_text(text, to_lang, from_lang="auto", backend=None):
     """
     Translate text from one language to another
     
+    Failures are retried, logged and counted in the translation metrics;
+    the original text is returned if every attempt fails.
+    
     Args:
         text: Text to translate
         to_lang: Target language code
         from_lang: Source language code (default: auto-detect)
+        backend: Translation backend (default: shared backend)
         
     Returns:
         str: Translated text
     """
-    try:
-        translator = Translator(to_lang=to_lang, from_lang=from_lang)
-        translated_text = translator.translate(text)
-        return translated_text
-    except Exception as e:
-        # If translation fails, return original text
-        return text
+    translated_text, _ = get_engine(backend).translate_one(text, to_lang, from_lang)
+    return translated_text
 
-def translate_subtitles(input_srt_path, output_srt_path, target_lang, source_lang="auto"):
+def translate_batch(texts, to_lang, from_lang="auto", backend=None, memory=None, use_memory=True,
+                    engine=None, stats=None):
+    """
+    Translate many lines with as few requests as possible
+    
+    Repeated lines are translated once, lines already in the translation
+    memory are not sent at all, and the rest are packed up to the
+    backend's character limit, sent concurrently and split back apart
+    after translation. If a batch comes back with the wrong number of
+    parts, its lines are retried one request each.
+    
+    Args:
+        texts: List of strings to translate
+        to_lang: Target language code
+        from_lang: Source language code (default: auto-detect)
+        backend: Translation backend (default: shared backend)
+        memory: Translation memory (default: the shared SQLite store)
+        use_memory: Set to False to bypass the translation memory (it is
+            always bypassed when from_lang is "auto")
+        engine: Translation engine to send requests through (default: engine for backend)
+        stats: Optional dict whose failed_lines count is increased by the
+            lines of this call kept untranslated
+        
+    Returns:
+        list: Translated strings, aligned with texts
+    """
+    engine = engine or get_engine(backend)
+    if from_lang == "auto":
+        # Rows are keyed on the source language; "auto" would mix languages,
+        # so callers pass the detected language to use the memory
+        memory = None
+    elif use_memory and memory is None:
+        memory = get_translation_memory()
+    elif not use_memory:
+        memory = None
+    
+    # Deduplicate on normalized text, keeping the first spelling of each line
+    unique = {}
+    for text in texts:
+        unique.setdefault(normalize_text(text), text)
+    
+    translations = memory.lookup(unique, from_lang, to_lang) if memory else {}
+    missing = [key for key in unique if key not in translations and key]
+    
+    if missing:
+        translated, failed = engine.translate_many([unique[key] for key in missing], to_lang, from_lang)
+        for position, key in enumerate(missing):
+            translations[key] = translated[position]
+        if memory:
+            # Failed lines hold the untranslated text and are not remembered
+            memory.store(
+                [(key, translated[position]) for position, key in enumerate(missing) if position not in failed],
+                from_lang, to_lang
+            )
+        if stats is not None:
+            failed_keys = {missing[position] for position in failed}
+            stats["failed_lines"] = stats.get("failed_lines", 0) + sum(
+                normalize_text(text) in failed_keys for text in texts
+            )
+    
+    return [translations.get(normalize_text(text), text) for text in texts]
+
+def translate_track(track, target_lang, source_lang="auto", backend=None, stats=None):
+    """
+    Translate a subtitle track in memory
+    
+    Args:
+        track: SubtitleTrack to translate
+        target_lang: Target language code
+        source_lang: Source language code (default: auto-detect)
+        backend: Translation backend (default: shared backend)
+        stats: Optional dict updated with failed_lines, as in translate_batch()
+        
+    Returns:
+        SubtitleTrack: Track with the same timing and translated texts
+    """
+    translated = translate_batch(
+        [text.strip() for text in track.texts], target_lang, source_lang, backend, stats=stats
+    )
+    return track.with_texts(translated)
+
+def translate_subtitles(input_srt_path, output_srt_path, target_lang, source_lang="auto", backend=None):
     """
     Translate an SRT subtitle file to target language
     
@@ -30,19 +150,78 @@ def translate_subtitles(input_srt_path, output_srt_path, target_lang, source_lan
         output_srt_path: Path where translated SRT file will be saved
         target_lang: Target language code
         source_lang: Source language code (default: auto-detect)
+        backend: Translation backend (default: shared backend)
+        
+    Returns:
+        SubtitleTrack: The translated track
     """
     try:
-        # Load the subtitle file
-        subs = pysrt.open(input_srt_path, encoding='utf-8')
-        
-        # Translate each subtitle
-        for sub in subs:
-            original_text = sub.text
-            translated_text = translate_text(original_text, target_lang, source_lang)
-            sub.text = translated_text
-        
-        # Save the translated subtitles
-        subs.save(output_srt_path, encoding='utf-8')
+        track = translate_track(SubtitleTrack.from_srt(input_srt_path), target_lang, source_lang, backend)
+        track.to_srt(output_srt_path)
+        return track
         
     except Exception as e:
         raise Exception(f"Error translating subtitles: {str(e)}")
+
+def translate_segments(segments, target_lang, source_lang="auto", backend=None, window=None, stats=None):
+    """
+    Translate a stream of subtitle segments in batches
+    
+    Segments are buffered until the next one would overflow one request,
+    then handed to a worker so several batches are in flight while
+    transcription continues. Results are yielded in the original order.
+    
+    Args:
+        segments: Iterable of objects with start, end and text attributes
+        target_lang: Target language code
+        source_lang: Source language code (default: auto-detect)
+        backend: Translation backend (default: shared backend)
+        window: Maximum batches in flight (default: the engine's concurrency)
+        stats: Optional dict updated with failed_lines, as in translate_batch()
+        
+    Yields:
+        SubtitleSegment: Segment with the same timing and translated text
+    """
+    engine = get_engine(backend)
+    window = window or engine.concurrency
+    # Separate from the engine's pool, whose threads these batches wait on
+    executor = ThreadPoolExecutor(max_workers=window, thread_name_prefix="translate-stream")
+    in_flight = deque()
+    pending = []
+    pending_length = 0
+    
+    def submit():
+        texts = [segment.text.strip() for segment in pending]
+        # Each batch counts into its own dict, merged here as it is drained
+        batch_stats = {}
+        future = executor.submit(translate_batch, texts, target_lang, source_lang, engine=engine, stats=batch_stats)
+        in_flight.append((list(pending), future, batch_stats))
+        pending.clear()
+    
+    def drain(limit):
+        # Yield batches in order: every batch beyond limit in flight, then
+        # any that have already finished
+        while len(in_flight) > limit or (in_flight and in_flight[0][1].done()):
+            batch, future, batch_stats = in_flight.popleft()
+            translated_texts = future.result()
+            if stats is not None:
+                stats["failed_lines"] = stats.get("failed_lines", 0) + batch_stats.get("failed_lines", 0)
+            for segment, translated_text in zip(batch, translated_texts):
+                yield SubtitleSegment(segment.start, segment.end, translated_text)
+    
+    try:
+        for segment in segments:
+            length = request_size(segment.text.strip()) + request_size(BATCH_SEPARATOR)
+            if pending and pending_length + length > engine.backend.max_chars:
+                submit()
+                pending_length = 0
+            # Bound the batches in flight, and pass finished ones on at once
+            yield from drain(window - 1)
+            pending.append(segment)
+            pending_length += length
+        
+        if pending:
+            submit()
+        yield from drain(0)
+    finally:
+        executor.shutdown(wait=False)
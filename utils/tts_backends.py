@@ -0,0 +1,83 @@
+import io
+import time
+
+from gtts import gTTS
+from pydub.generators import Sine
+
+from utils.audio_decoder import decode_in_pool
+
+
+class GTTSBackend:
+    """
+    Google Translate text-to-speech (the default backend)
+    """
+
+    name = "gtts"
+
+    def __init__(self, tld="com"):
+        # gTTS picks the accent through the Google domain
+        self.voice = tld
+
+    def synthesize(self, text, language):
+        """
+        Synthesize speech for one line of text
+
+        Args:
+            text: Text to speak
+            language: Language code
+
+        Returns:
+            AudioSegment: Decoded speech
+        """
+        # The MP3 stays in memory and is decoded on the shared decoder pool
+        buffer = io.BytesIO()
+        tts = gTTS(text, lang=language, tld=self.voice)
+        tts.write_to_fp(buffer)
+        return decode_in_pool(buffer.getvalue(), "mp3")
+
+
+class LocalTestBackend:
+    """
+    Offline stand-in that returns a tone sized to the text after a fixed delay
+
+    Used to exercise the synthesis pipeline without network access; the
+    latency simulates a remote TTS round-trip.
+    """
+
+    name = "local"
+
+    def __init__(self, latency=0.2, chars_per_second=15.0, frame_rate=24000, voice="tone"):
+        self.latency = latency
+        self.chars_per_second = chars_per_second
+        self.frame_rate = frame_rate
+        self.voice = voice
+
+    def synthesize(self, text, language):
+        if self.latency:
+            time.sleep(self.latency)
+        duration_ms = max(100, int(len(text) / self.chars_per_second * 1000))
+        tone = Sine(220, sample_rate=self.frame_rate).to_audio_segment(duration=duration_ms, volume=-20)
+        return tone.set_channels(1)
+
+
+TTS_BACKENDS = {
+    GTTSBackend.name: GTTSBackend,
+    LocalTestBackend.name: LocalTestBackend,
+}
+
+
+def get_tts_backend(name="gtts", **kwargs):
+    """
+    Create a TTS backend by name
+
+    Args:
+        name: Registered backend name ("gtts" or "local")
+        **kwargs: Backend constructor arguments
+
+    Returns:
+        Backend instance with name, voice and synthesize(text, language)
+    """
+    try:
+        return TTS_BACKENDS[name](**kwargs)
+    except KeyError:
+        raise ValueError(f"Unknown TTS backend: {name}")
@@ -0,0 +1,122 @@
+import hashlib
+import os
+import threading
+import wave
+
+from pydub import AudioSegment
+
+from utils.cache import get_cache_dir, touch, enforce_size_limit, directory_size, normalize_text
+
+DEFAULT_MAX_BYTES = int(os.environ.get("AIDUB_TTS_CACHE_MB", "512")) * 1024 * 1024
+
+
+class ClipCache:
+    """
+    Disk-backed cache of decoded TTS clips shared across jobs and sessions
+
+    Clips are stored as PCM WAV files keyed by (normalized text, language,
+    voice, backend). The least recently used clips are evicted once the
+    directory grows beyond max_bytes.
+    """
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory or get_cache_dir("tts_clips")
+        os.makedirs(self.directory, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Track the directory size incrementally so eviction only scans
+        # the directory when the cap is actually exceeded
+        self._size = directory_size(self.directory)
+
+    def make_key(self, text, language, voice, backend_name):
+        """
+        Build the cache key for one line of speech
+
+        Returns:
+            str: Hex key
+        """
+        raw = "\x1f".join([normalize_text(text), language, str(voice), backend_name])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.directory, f"{key}.wav")
+
+    def get(self, key):
+        """
+        Look up a cached clip
+
+        Returns:
+            AudioSegment: The decoded clip, or None on a miss
+        """
+        path = self._entry_path(key)
+        try:
+            with wave.open(path, "rb") as wav_file:
+                audio = AudioSegment(
+                    data=wav_file.readframes(wav_file.getnframes()),
+                    sample_width=wav_file.getsampwidth(),
+                    frame_rate=wav_file.getframerate(),
+                    channels=wav_file.getnchannels()
+                )
+        except (OSError, EOFError, wave.Error):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        touch(path)
+        with self._lock:
+            self.hits += 1
+        return audio
+
+    def put(self, key, audio):
+        """
+        Store a decoded clip
+
+        Args:
+            key: Cache key from make_key()
+            audio: AudioSegment to store
+        """
+        path = self._entry_path(key)
+        # Write to a temporary file first so readers never see partial entries
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with wave.open(temp_path, "wb") as wav_file:
+            wav_file.setnchannels(audio.channels)
+            wav_file.setsampwidth(audio.sample_width)
+            wav_file.setframerate(audio.frame_rate)
+            wav_file.writeframes(audio.raw_data)
+        size = os.path.getsize(temp_path)
+        os.replace(temp_path, path)
+
+        with self._lock:
+            self._size += size
+            over_limit = self._size > self.max_bytes
+        if over_limit:
+            enforce_size_limit(self.directory, self.max_bytes)
+            with self._lock:
+                self._size = directory_size(self.directory)
+
+    def stats(self):
+        """Return lifetime hit/miss counters for this cache"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "size_bytes": self._size,
+            }
+
+
+# Shared cache for the whole process
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_clip_cache():
+    """Return the process-wide TTS clip cache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ClipCache()
+        return _cache
@@ -1,10 +1,203 @@
 import os
-from moviepy.editor import VideoFileClip, AudioFileClip  # FIXED: movtepy → moviepy
+import re
+import shutil
+import subprocess
+import tempfile
+import numpy as np
 
-def extract_audio(video_path, output_audio_path):
+from utils.wav_io import write_wav
+
+# Whisper works on 16 kHz mono audio, so extract straight to that format
+WHISPER_SAMPLE_RATE = 16000
+
+def get_ffmpeg_binary():
+    """
+    Locate the ffmpeg executable
+    
+    Uses FFMPEG_BINARY if set, then ffmpeg on PATH, then the binary
+    bundled with imageio-ffmpeg (installed alongside moviepy).
+    """
+    binary = os.environ.get("FFMPEG_BINARY")
+    if binary:
+        return binary
+    binary = shutil.which("ffmpeg")
+    if binary:
+        return binary
+    import imageio_ffmpeg
+    return imageio_ffmpeg.get_ffmpeg_exe()
+
+def run_ffmpeg(args):
+    """
+    Run ffmpeg with the given arguments and raise on failure
+    
+    Args:
+        args: Arguments after the ffmpeg executable
+    """
+    command = [get_ffmpeg_binary(), "-nostdin", "-hide_banner", "-loglevel", "error", "-y"] + args
+    result = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        message = result.stderr.decode("utf-8", errors="replace").strip()
+        raise RuntimeError(message or f"ffmpeg exited with code {result.returncode}")
+
+def extract_audio(video_path, output_audio_path, sample_rate=WHISPER_SAMPLE_RATE, channels=1):
     """
-    Extract audio from video file using moviepy
+    Extract audio from video file as 16-bit PCM WAV using ffmpeg
+    
+    Only the first audio stream is decoded (no video decoding) and it is
+    resampled directly to the rate Whisper expects.
+    
+    Args:
+        video_path: Path to input video
+        output_audio_path: Path where the WAV file will be saved
+        sample_rate: Output sample rate (default: 16 kHz)
+        channels: Output channel count (default: mono)
     """
+    try:
+        run_ffmpeg([
+            "-i", video_path,
+            "-map", "0:a:0",
+            "-vn", "-sn", "-dn",
+            "-ac", str(channels),
+            "-ar", str(sample_rate),
+            "-c:a", "pcm_s16le",
+            output_audio_path
+        ])
+    except Exception as e:
+        raise Exception(f"Error extracting audio: {str(e)}")
+
+def probe_media(media_path):
+    """
+    Return ffmpeg's stream information for a media file as text
+    """
+    command = [get_ffmpeg_binary(), "-nostdin", "-hide_banner", "-i", media_path]
+    # ffmpeg exits non-zero without an output file but still prints stream info
+    result = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    return result.stderr.decode("utf-8", errors="replace")
+
+def probe_duration(media_path):
+    """
+    Return the container duration in seconds, or None if unknown
+    """
+    match = re.search(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)", probe_media(media_path))
+    if not match:
+        return None
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+class ExtractedAudio:
+    """
+    Decoded mono audio kept in memory, with an on-demand WAV copy
+    
+    The transcriber consumes the samples array directly; the WAV file is
+    only written the first time a later stage asks for a path.
+    """
+    
+    def __init__(self, samples, sample_rate, wav_path=None):
+        self.samples = samples
+        self.sample_rate = sample_rate
+        self.wav_path = wav_path
+        self._wav_written = False
+    
+    @property
+    def wav_written(self):
+        """Whether the WAV copy exists on disk"""
+        return self._wav_written
+    
+    @property
+    def duration(self):
+        """Length in seconds"""
+        return len(self.samples) / self.sample_rate
+    
+    def ensure_wav(self, wav_path=None):
+        """
+        Write the samples to a WAV file if that has not happened yet
+        
+        Returns:
+            str: Path of the WAV file
+        """
+        if wav_path is not None and wav_path != self.wav_path:
+            self.wav_path = wav_path
+            self._wav_written = False
+        if self.wav_path is None:
+            raise ValueError("No WAV path configured for extracted audio")
+        if not self._wav_written:
+            write_wav(self.wav_path, self.samples, self.sample_rate)
+            self._wav_written = True
+        return self.wav_path
+
+def load_audio(video_path, sample_rate=WHISPER_SAMPLE_RATE, wav_path=None):
+    """
+    Decode the audio track of a video into memory as float32 mono samples
+    
+    ffmpeg decodes only the audio stream and pipes raw float32 PCM, which
+    is read straight into a buffer preallocated from the probed duration.
+    
+    Args:
+        video_path: Path to input video
+        sample_rate: Output sample rate (default: 16 kHz)
+        wav_path: Where to write a WAV copy if one is requested later
+        
+    Returns:
+        ExtractedAudio: Samples ready for transcription
+    """
+    try:
+        duration = probe_duration(video_path) or 60.0
+        # One extra second absorbs rounding in the container duration
+        buffer = np.empty(int((duration + 1) * sample_rate), dtype=np.float32)
+        
+        command = [
+            get_ffmpeg_binary(), "-nostdin", "-hide_banner", "-loglevel", "error",
+            "-i", video_path,
+            "-map", "0:a:0",
+            "-vn", "-sn", "-dn",
+            "-ac", "1",
+            "-ar", str(sample_rate),
+            "-f", "f32le",
+            "-c:a", "pcm_f32le",
+            "pipe:1"
+        ]
+        # Errors go to a temporary file: a pipe could fill up with decode
+        # errors while stdout is being read and stall ffmpeg
+        with tempfile.TemporaryFile() as stderr_file:
+            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr_file)
+            try:
+                filled = 0
+                view = memoryview(buffer).cast("B")
+                while True:
+                    if filled == len(view):
+                        # Duration was underestimated; grow the buffer geometrically
+                        grown = np.empty(len(buffer) * 2, dtype=np.float32)
+                        grown[:len(buffer)] = buffer
+                        buffer = grown
+                        view = memoryview(buffer).cast("B")
+                    read = process.stdout.readinto(view[filled:])
+                    if not read:
+                        break
+                    filled += read
+                returncode = process.wait()
+            finally:
+                # Never leave ffmpeg running (or a zombie) when reading fails
+                if process.poll() is None:
+                    process.kill()
+                process.wait()
+                process.stdout.close()
+            
+            if returncode != 0:
+                stderr_file.seek(0)
+                raise RuntimeError(stderr_file.read().decode("utf-8", errors="replace").strip())
+        
+        samples = buffer[:filled // buffer.itemsize]
+        return ExtractedAudio(samples, sample_rate, wav_path)
+    except Exception as e:
+        raise Exception(f"Error extracting audio: {str(e)}")
+
+def extract_audio_moviepy(video_path, output_audio_path):
+    """
+    Extract audio from video file using moviepy (full-rate stereo WAV)
+    """
+    # Only the benchmark uses moviepy; import it here so the pipeline does not need it
+    from moviepy.editor import VideoFileClip
+    
     try:
         video = VideoFileClip(video_path)
         audio = video.audio
@@ -14,36 +207,122 @@ def extract_audio(video_path, output_audio_path):
     except Exception as e:
         raise Exception(f"Error extracting audio: {str(e)}")
 
-def replace_audio_track(video_path, audio_path, output_path):
+# Video codecs that can be stream-copied into an MP4/MOV container
+MP4_VIDEO_CODECS = {"h264", "hevc", "mpeg4", "av1", "vp9", "mpeg2video", "mpeg1video"}
+
+DEFAULT_ENCODE_THREADS = int(os.environ.get("AIDUB_ENCODE_THREADS", "0"))
+DEFAULT_ENCODE_PRESET = os.environ.get("AIDUB_ENCODE_PRESET", "veryfast")
+
+# WebM only holds VP8/VP9/AV1 video with Vorbis/Opus audio; other containers get H.264/AAC
+WEBM_AUDIO_ARGS = ["-c:a", "libopus", "-b:a", "128k"]
+DEFAULT_AUDIO_ARGS = ["-c:a", "aac", "-b:a", "192k"]
+
+# Audio track language tags for the app's target languages
+ISO_639_2_CODES = {
+    "en": "eng", "es": "spa", "fr": "fra", "de": "deu", "hi": "hin", "ta": "tam",
+    "ar": "ara", "zh": "zho", "ja": "jpn", "ko": "kor", "pt": "por", "ru": "rus",
+    "it": "ita", "nl": "nld", "pl": "pol", "tr": "tur", "vi": "vie", "th": "tha",
+    "id": "ind", "ms": "msa",
+}
+
+def probe_video_codec(video_path):
+    """
+    Return the codec name of the first video stream, or None if unknown
+    """
+    match = re.search(r"Stream #\S+.*?: Video: (\w+)", probe_media(video_path))
+    return match.group(1) if match else None
+
+def needs_reencode(video_path, output_path):
+    """
+    Decide whether the video stream has to be re-encoded for the output container
+    """
+    extension = os.path.splitext(output_path)[1].lower()
+    if extension in (".mkv", ".webm") and extension == os.path.splitext(video_path)[1].lower():
+        return False
+    if extension in (".mp4", ".m4v", ".mov"):
+        return probe_video_codec(video_path) not in MP4_VIDEO_CODECS
+    return True
+
+def replace_audio_track(video_path, audio_path, output_path, reencode=None,
+                        threads=DEFAULT_ENCODE_THREADS, preset=DEFAULT_ENCODE_PRESET):
     """
     Replace the audio track of a video with new audio
+    
+    By default the video stream is copied bit-for-bit and only the new
+    audio is encoded (to AAC, or Opus for WebM). The video is re-encoded
+    (libx264, or VP9 for WebM) only when the output container cannot hold
+    the source codec (or when the stream copy fails).
+    
+    Args:
+        video_path: Path to input video
+        audio_path: Path to the new audio track
+        output_path: Path where the output video will be saved
+        reencode: Force (True) or forbid (False) re-encoding; None decides automatically
+        threads: Encoder threads when re-encoding (0 = all cores)
+        preset: libx264 preset when re-encoding
     """
     try:
-        # Load the video file
-        video = VideoFileClip(video_path)
-        
-        # Load the new audio file
-        audio = AudioFileClip(audio_path)
-        
-        # Set the new audio to the video
-        video_with_new_audio = video.set_audio(audio)
-        
-        # Save the new video file
-        video_with_new_audio.write_videofile(
-            output_path,
-            codec='libx264',
-            audio_codec='aac',
-            temp_audiofile='temp-audio.m4a',
-            remove_temp=True,
-            verbose=False,
-            logger=None,
-            threads=1
-        )
-        
-        # Clean up
-        video.close()
-        audio.close()
-        video_with_new_audio.close()
-        
+        _mux_audio(video_path, [(None, audio_path)], output_path, reencode, threads, preset)
     except Exception as e:
         raise Exception(f"Error replacing audio track: {str(e)}")
+
+def mux_audio_tracks(video_path, audio_tracks, output_path, reencode=None,
+                     threads=DEFAULT_ENCODE_THREADS, preset=DEFAULT_ENCODE_PRESET):
+    """
+    Write a video with new audio tracks in place of the original audio
+    
+    Each track is tagged with its language so players offer a language
+    switch; the first track is the default. The video stream is copied
+    unless it has to be re-encoded, as in replace_audio_track().
+    
+    Args:
+        video_path: Path to input video
+        audio_tracks: List of (language code or None, audio path)
+        output_path: Path where the output video will be saved
+        reencode: Force (True) or forbid (False) re-encoding; None decides automatically
+        threads: Encoder threads when re-encoding (0 = all cores)
+        preset: libx264 preset when re-encoding
+    """
+    try:
+        _mux_audio(video_path, audio_tracks, output_path, reencode, threads, preset)
+    except Exception as e:
+        raise Exception(f"Error muxing audio tracks: {str(e)}")
+
+def _mux_audio(video_path, audio_tracks, output_path, reencode, threads, preset):
+    if reencode is None:
+        reencode = needs_reencode(video_path, output_path)
+    
+    inputs = ["-i", video_path]
+    maps = ["-map", "0:v:0"]
+    track_args = []
+    for index, (language, audio_path) in enumerate(audio_tracks):
+        inputs += ["-i", audio_path]
+        maps += ["-map", f"{index + 1}:a:0"]
+        if language:
+            # MP4 only stores three-letter (ISO 639-2) codes and drops others
+            language = language.split("-")[0].lower()
+            language = ISO_639_2_CODES.get(language, language)
+            track_args += [f"-metadata:s:a:{index}", f"language={language}"]
+        if len(audio_tracks) > 1:
+            track_args += [f"-disposition:a:{index}", "default" if index == 0 else "0"]
+    if os.path.splitext(output_path)[1].lower() == ".webm":
+        audio_args = WEBM_AUDIO_ARGS + track_args
+        mux_args = [output_path]
+        encode_args = [
+            "-c:v", "libvpx-vp9", "-deadline", "realtime", "-cpu-used", "8",
+            "-crf", "32", "-b:v", "0", "-row-mt", "1", "-threads", str(threads)
+        ]
+    else:
+        audio_args = DEFAULT_AUDIO_ARGS + track_args
+        mux_args = ["-movflags", "+faststart", output_path]
+        encode_args = ["-c:v", "libx264", "-preset", preset, "-threads", str(threads)]
+    
+    if not reencode:
+        try:
+            run_ffmpeg(inputs + maps + ["-c:v", "copy"] + audio_args + mux_args)
+            return
+        except RuntimeError:
+            # Some streams cannot be copied as-is; fall back to encoding
+            pass
+    
+    run_ffmpeg(inputs + maps + encode_args + audio_args + mux_args)
@@ -0,0 +1,35 @@
+import wave
+
+import numpy as np
+
+
+def float_to_pcm16(samples):
+    """
+    Convert float samples in [-1, 1] to 16-bit PCM
+
+    Args:
+        samples: float32 array, shape (frames,) or (frames, channels)
+
+    Returns:
+        numpy.ndarray: int16 array of the same shape
+    """
+    return (np.clip(samples, -1.0, 1.0) * 32767.0).astype(np.int16)
+
+
+def write_wav(path, samples, sample_rate):
+    """
+    Write float32 or int16 samples to a 16-bit PCM WAV file
+
+    Args:
+        path: Output path
+        samples: Array of shape (frames,) for mono or (frames, channels)
+        sample_rate: Sample rate in Hz
+    """
+    if samples.dtype != np.int16:
+        samples = float_to_pcm16(samples)
+    channels = 1 if samples.ndim == 1 else samples.shape[1]
+    with wave.open(path, "wb") as wav_file:
+        wav_file.setnchannels(channels)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(np.ascontiguousarray(samples).tobytes())